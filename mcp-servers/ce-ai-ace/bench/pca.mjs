@@ -0,0 +1,116 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark: PCA-projected flat index vs full 384-dim flat index
+ *
+ * Reports scan speedup and how often the Curator merge decision (best match
+ * at the 0.85 similarity threshold, or no merge) changes, with and without
+ * exact rescoring of near-threshold candidates.
+ *
+ * Usage: npm run build && node bench/pca.mjs [patterns] [queries]
+ */
+
+import { FlatIndex } from '../dist/embeddings/vector-index.js';
+import { PcaProjection, ProjectedIndex } from '../dist/embeddings/pca.js';
+
+const DIM = 384;
+const THRESHOLD = 0.85;
+const MARGIN = 0.05;
+const PATTERNS = parseInt(process.argv[2] || '20000', 10);
+const QUERIES = parseInt(process.argv[3] || '1000', 10);
+const CLUSTER_SIZE = 20;
+const FIT_SAMPLE = 5000;
+const TARGET_DIMS = [128, 64];
+
+// Deterministic PRNG (mulberry32) so runs are comparable
+let seed = 42;
+function random() {
+  seed |= 0;
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+
+function gaussian() {
+  return Math.sqrt(-2 * Math.log(1 - random())) * Math.cos(2 * Math.PI * random());
+}
+
+function normalize(vector) {
+  const norm = Math.sqrt(vector.reduce((sum, x) => sum + x * x, 0));
+  return Float32Array.from(vector, x => x / norm);
+}
+
+// Sentence embeddings have a decaying spectrum; mimic it per dimension
+const spectrum = Array.from({ length: DIM }, (_, i) => 1 / (1 + i / 16));
+
+function randomVector() {
+  return normalize(spectrum.map(s => gaussian() * s));
+}
+
+// Noise spread so cluster members land around the 0.85 merge threshold
+function nearby(center) {
+  const sigma = 0.4 + random() * 0.4;
+  return normalize(center.map((x, i) => x + gaussian() * sigma * spectrum[i] / 4));
+}
+
+console.log(`\n📐 PCA projection benchmark (${PATTERNS} patterns, ${QUERIES} queries, ${DIM} dims)\n`);
+
+const centers = Array.from({ length: Math.ceil(PATTERNS / CLUSTER_SIZE) }, randomVector);
+const exact = new Map();
+const vectors = [];
+
+for (let i = 0; i < PATTERNS; i++) {
+  const vector = nearby(centers[i % centers.length]);
+  exact.set(`pat-${i}`, vector);
+  vectors.push(vector);
+}
+
+const queries = Array.from({ length: QUERIES }, () =>
+  nearby(centers[Math.floor(random() * centers.length)])
+);
+
+function build(index) {
+  for (const [id, vector] of exact) {
+    index.add(id, vector);
+  }
+  return index;
+}
+
+function run(index) {
+  const start = process.hrtime.bigint();
+  const decisions = queries.map(query => index.search(query, THRESHOLD)[0]?.id ?? null);
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  return { decisions, ms };
+}
+
+function changed(a, b) {
+  let count = 0;
+  for (let i = 0; i < QUERIES; i++) {
+    if (a.decisions[i] !== b.decisions[i]) count++;
+  }
+  return count;
+}
+
+const full = run(build(new FlatIndex()));
+const merges = full.decisions.filter(d => d !== null).length;
+
+console.log(`Full ${DIM} dims: ${(full.ms / QUERIES).toFixed(3)} ms/query, ${merges}/${QUERIES} queries merge\n`);
+
+for (const dims of TARGET_DIMS) {
+  const fitStart = process.hrtime.bigint();
+  const projection = PcaProjection.fit(vectors.slice(0, FIT_SAMPLE), dims);
+  const fitMs = Number(process.hrtime.bigint() - fitStart) / 1e6;
+
+  // Projected scan alone (rescoring disabled) vs with exact rescoring
+  const scanOnly = run(build(new ProjectedIndex(new FlatIndex(), projection, 0)));
+  const rescoredIndex = build(new ProjectedIndex(new FlatIndex(), projection, MARGIN));
+  rescoredIndex.setExactSource(ids => new Map(ids.map(id => [id, exact.get(id)])));
+  const rescored = run(rescoredIndex);
+
+  const pct = count => `${count}/${QUERIES} (${((count / QUERIES) * 100).toFixed(2)}%)`;
+
+  console.log(`${DIM} → ${dims} dims (fit: ${fitMs.toFixed(0)} ms on ${Math.min(FIT_SAMPLE, PATTERNS)} vectors)`);
+  console.log(`   scan only: ${(scanOnly.ms / QUERIES).toFixed(3)} ms/query (${(full.ms / scanOnly.ms).toFixed(2)}x), decisions changed ${pct(changed(full, scanOnly))}`);
+  console.log(`   rescored:  ${(rescored.ms / QUERIES).toFixed(3)} ms/query (${(full.ms / rescored.ms).toFixed(2)}x), decisions changed ${pct(changed(full, rescored))}\n`);
+}
@@ -0,0 +1,101 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark: int8 quantized index vs float32 flat index
+ *
+ * Reports vector memory and how often the Curator merge decision
+ * (best match at the 0.85 similarity threshold, or no merge) agrees.
+ *
+ * Usage: npm run build && node bench/quantization.mjs [patterns] [queries]
+ */
+
+import { FlatIndex } from '../dist/embeddings/vector-index.js';
+import { QuantizedIndex } from '../dist/embeddings/quantized-index.js';
+
+const DIM = 384;
+const THRESHOLD = 0.85;
+const MARGIN = 0.05;
+const PATTERNS = parseInt(process.argv[2] || '20000', 10);
+const QUERIES = parseInt(process.argv[3] || '1000', 10);
+const CLUSTER_SIZE = 20;
+
+// Deterministic PRNG (mulberry32) so runs are comparable
+let seed = 42;
+function random() {
+  seed |= 0;
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+
+function gaussian() {
+  return Math.sqrt(-2 * Math.log(1 - random())) * Math.cos(2 * Math.PI * random());
+}
+
+function normalize(vector) {
+  const norm = Math.sqrt(vector.reduce((sum, x) => sum + x * x, 0));
+  return Float32Array.from(vector, x => x / norm);
+}
+
+function randomVector() {
+  return normalize(Array.from({ length: DIM }, gaussian));
+}
+
+// Noise spread so cluster members land around the 0.85 merge threshold
+function nearby(center) {
+  const sigma = 0.015 + random() * 0.02;
+  return normalize(center.map(x => x + gaussian() * sigma));
+}
+
+console.log(`\n📐 Int8 quantization benchmark (${PATTERNS} patterns, ${QUERIES} queries, ${DIM} dims)\n`);
+
+const centers = Array.from({ length: Math.ceil(PATTERNS / CLUSTER_SIZE) }, randomVector);
+const exact = new Map();
+const flat = new FlatIndex();
+const quantized = new QuantizedIndex(MARGIN);
+quantized.setExactSource(ids => new Map(ids.map(id => [id, exact.get(id)])));
+
+for (let i = 0; i < PATTERNS; i++) {
+  const id = `pat-${i}`;
+  const vector = nearby(centers[i % centers.length]);
+  exact.set(id, vector);
+  flat.add(id, vector);
+  quantized.add(id, vector);
+}
+
+const queries = Array.from({ length: QUERIES }, () =>
+  nearby(centers[Math.floor(random() * centers.length)])
+);
+
+function run(index) {
+  const start = process.hrtime.bigint();
+  const decisions = queries.map(query => index.search(query, THRESHOLD)[0]?.id ?? null);
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  return { decisions, ms };
+}
+
+const float32 = run(flat);
+const int8 = run(quantized);
+
+let agree = 0;
+let merges = 0;
+for (let i = 0; i < QUERIES; i++) {
+  if (float32.decisions[i] === int8.decisions[i]) agree++;
+  if (float32.decisions[i] !== null) merges++;
+}
+
+const float32Bytes = PATTERNS * DIM * 4;
+const int8Bytes = quantized.byteSize();
+
+console.log('Memory (vectors only)');
+console.log(`   float32: ${(float32Bytes / 1024 / 1024).toFixed(2)} MB`);
+console.log(`   int8:    ${(int8Bytes / 1024 / 1024).toFixed(2)} MB`);
+console.log(`   saved:   ${((1 - int8Bytes / float32Bytes) * 100).toFixed(1)}%\n`);
+
+console.log('Scan time');
+console.log(`   float32: ${(float32.ms / QUERIES).toFixed(3)} ms/query`);
+console.log(`   int8:    ${(int8.ms / QUERIES).toFixed(3)} ms/query (incl. rescoring)\n`);
+
+console.log(`Merge decisions at ${THRESHOLD} (${merges}/${QUERIES} queries merge under float32)`);
+console.log(`   agreement: ${agree}/${QUERIES} (${((agree / QUERIES) * 100).toFixed(2)}%)\n`);
@@ -0,0 +1,199 @@
+#!/usr/bin/env node
+
+/**
+ * Benchmark: ACEStorage hot paths against a real patterns.db
+ *
+ * Drives the built ACEStorage (schema, prepared and cached statements, write
+ * queue) through its public methods on a temporary database: cached reads,
+ * stats, keyset pages (first vs deep), SQL confidence filters and counter
+ * updates. Patterns are seeded with random unit vectors via addPatterns, so
+ * the embedding model only has to load (it is downloaded on first use).
+ *
+ * Then replays the SQL behind those paths on a second connection to the same
+ * file, preparing it on every call (before) and reusing one prepared
+ * statement (after).
+ *
+ * Usage: npm run build && node bench/statements.mjs [patterns] [calls]
+ */
+
+import Database from 'better-sqlite3';
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { getConfig } from '../dist/config.js';
+import { ACEStorage } from '../dist/storage/index.js';
+
+const DIM = 384;
+const DOMAINS = 8;
+const SEED_BATCH = 500;
+const PAGE_SIZE = 100;
+const PAGE_FIELDS = ['id', 'name', 'domain', 'content', 'confidence', 'observations', 'harmful'];
+const PATTERNS = parseInt(process.argv[2] || '20000', 10);
+const CALLS = parseInt(process.argv[3] || '2000', 10);
+
+// Deterministic PRNG (mulberry32) so runs are comparable
+let seed = 42;
+function random() {
+  seed |= 0;
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+
+function unitVector() {
+  const vector = new Float32Array(DIM);
+  let norm = 0;
+  for (let i = 0; i < DIM; i++) {
+    vector[i] = random() - 0.5;
+    norm += vector[i] * vector[i];
+  }
+  norm = Math.sqrt(norm);
+  for (let i = 0; i < DIM; i++) vector[i] /= norm;
+  return vector;
+}
+
+function pattern(i) {
+  const now = new Date().toISOString();
+  const observations = 1 + Math.floor(random() * 50);
+  const harmful = Math.floor(random() * 10);
+  return {
+    id: `pat-${i}`,
+    name: `Pattern ${i}`,
+    domain: `domain-${i % DOMAINS}`,
+    content: `Pattern ${i}: ${'use prepared statements and batch writes '.repeat(3)}`,
+    confidence: observations / (observations + harmful),
+    observations,
+    harmful,
+    evidence: [],
+    created_at: now,
+    updated_at: now,
+    metadata: { source: 'bench' },
+  };
+}
+
+// SQL behind the hot paths, with arguments for call i
+const PAGE_COLUMNS = 'id, name, domain, content, confidence, observations, harmful';
+const STATEMENTS = [
+  {
+    name: 'pattern by id',
+    sql: 'SELECT id, name, domain, content, confidence, observations, harmful, created_at, updated_at, metadata FROM patterns WHERE id = ?',
+    args: i => [`pat-${(i * 7919) % PATTERNS}`],
+  },
+  {
+    name: 'domain stats',
+    sql: 'SELECT domain, total, high, medium FROM domain_stats ORDER BY domain',
+    args: () => [],
+  },
+  {
+    name: `deep page of ${PAGE_SIZE}`,
+    sql: `SELECT ${PAGE_COLUMNS} FROM patterns WHERE confidence <= ? AND (confidence < ? OR (confidence = ? AND ` +
+      '(observations < ? OR (observations = ? AND id > ?)))) ORDER BY confidence DESC, observations DESC, id LIMIT ?',
+    args: (i, [confidence, observations, id]) => [confidence, confidence, confidence, observations, observations, id, PAGE_SIZE],
+  },
+  {
+    name: 'confidence range',
+    sql: 'SELECT id, confidence, observations, harmful FROM patterns WHERE confidence >= ? AND confidence < ? ORDER BY confidence DESC, observations DESC',
+    args: () => [0, 0.3],
+  },
+  {
+    name: 'update counters',
+    sql: 'UPDATE patterns SET observations = ?, harmful = ?, confidence = ?, updated_at = ? WHERE id = ?',
+    args: i => [10 + (i % 5), 1, 0.9, new Date().toISOString(), `pat-${(i * 7919) % PATTERNS}`],
+    write: true,
+  },
+];
+
+async function time(label, calls, fn) {
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < calls; i++) await fn(i);
+  const us = Number(process.hrtime.bigint() - start) / 1e3 / calls;
+  console.log(`   ${label.padEnd(40)} ${us.toFixed(2).padStart(10)} µs/call`);
+  return us;
+}
+
+const dir = mkdtempSync(join(tmpdir(), 'ace-bench-'));
+process.env.ACE_STORAGE_PATH = join(dir, 'patterns.db');
+
+try {
+  const storage = new ACEStorage(getConfig());
+  await storage.initialize();
+  await storage.whenReady();
+
+  for (let start = 0; start < PATTERNS; start += SEED_BATCH) {
+    const entries = [];
+    for (let i = start; i < Math.min(start + SEED_BATCH, PATTERNS); i++) {
+      entries.push({ pattern: pattern(i), embedding: unitVector() });
+    }
+    await storage.addPatterns(entries);
+  }
+
+  // Cursor of the last page, found by walking the listing once
+  let cursor;
+  let deepCursor;
+  do {
+    deepCursor = cursor;
+    ({ next_cursor: cursor } = await storage.getPatternsPage({ limit: PAGE_SIZE, cursor, fields: ['id'] }));
+  } while (cursor);
+
+  // Sort key of the deep page's cursor (base64url JSON)
+  const deepKey = JSON.parse(Buffer.from(deepCursor, 'base64url').toString('utf-8'));
+
+  // Second connection for the before/after replay and query plans
+  const db = new Database(process.env.ACE_STORAGE_PATH);
+  const deepPage = STATEMENTS.find(({ name }) => name.startsWith('deep page'));
+  const plan = db.prepare(`EXPLAIN QUERY PLAN ${deepPage.sql}`).all(...deepPage.args(0, deepKey));
+
+  console.log(`\n🧮 ACEStorage benchmark (${PATTERNS} patterns, ${CALLS} calls)\n`);
+  console.log(`   Deep page plan: ${plan.map(row => row.detail).join('; ')}\n`);
+
+  const id = i => `pat-${(i * 7919) % PATTERNS}`;
+
+  // Load the pattern cache once so getPattern is timed in steady state
+  await storage.getPattern(id(0));
+
+  await time('getPattern (pattern cache)', CALLS, i => storage.getPattern(id(i)));
+  await time('getStats (domain_stats)', CALLS, () => storage.getStats());
+  const first = await time(`getPatternsPage first ${PAGE_SIZE}`, CALLS, () =>
+    storage.getPatternsPage({ limit: PAGE_SIZE, fields: PAGE_FIELDS })
+  );
+  const deep = await time(`getPatternsPage last ${PAGE_SIZE}`, CALLS, () =>
+    storage.getPatternsPage({ limit: PAGE_SIZE, cursor: deepCursor, fields: PAGE_FIELDS })
+  );
+  await time('getPatternsPage last, one domain', CALLS, () =>
+    storage.getPatternsPage({ limit: PAGE_SIZE, cursor: deepCursor, domain: 'domain-3', fields: PAGE_FIELDS })
+  );
+  await time('getPatternsByConfidence(0, 0.3)', CALLS, () =>
+    storage.getPatternsByConfidence(0, 0.3, undefined, ['id', 'confidence', 'observations', 'harmful'])
+  );
+  await time('getConstitutionPatterns([id, content])', Math.max(1, CALLS / 10), () =>
+    storage.getConstitutionPatterns(['id', 'content'])
+  );
+  await time('updatePattern counters (write queue)', CALLS, i =>
+    storage.updatePattern(id(i), { observations: 10 + (i % 5), harmful: 1, confidence: 0.9 })
+  );
+
+  console.log(`\n   Deep/first page ratio: ${(deep / first).toFixed(2)}x`);
+
+  const writes = storage.getWriteQueueStats();
+  console.log(`   Write queue: ${writes.transactions} transactions for ${writes.writes} writes\n`);
+
+  console.log('   Statement preparation (before: prepare per call, after: prepared once)\n');
+  for (const { name, sql, args, write } of STATEMENTS) {
+    const stmt = db.prepare(sql);
+    const call = prepared => (write
+      ? i => prepared(sql).run(...args(i, deepKey))
+      : i => prepared(sql).all(...args(i, deepKey)));
+
+    const before = await time(`${name}: prepare per call`, CALLS, call(text => db.prepare(text)));
+    const after = await time(`${name}: prepared once`, CALLS, call(() => stmt));
+    console.log(`   ${name}: ${(before / after).toFixed(2)}x\n`);
+  }
+
+  db.close();
+} finally {
+  rmSync(dir, { recursive: true, force: true });
+}
+
+// Embedding workers and background timers would keep the process alive
+process.exit(0);
@@ -0,0 +1,55 @@
+#!/usr/bin/env node
+
+/**
+ * ACE Storage Compaction
+ *
+ * Offline maintenance: rewrites evidence and metadata in patterns.db with the
+ * configured compression (ACE_COMPRESSION) and VACUUMs the file. Run it while
+ * no ACE server is using the database.
+ *
+ * Usage: npm run compact
+ */
+
+import Database from 'better-sqlite3';
+import { existsSync } from 'fs';
+import { getConfig } from './config.js';
+import { compactValues } from './storage/compression.js';
+
+function formatBytes(bytes: number): string {
+  return bytes >= 1024 * 1024
+    ? `${(bytes / (1024 * 1024)).toFixed(1)} MB`
+    : `${(bytes / 1024).toFixed(1)} KB`;
+}
+
+function main(): void {
+  const config = getConfig();
+  const path = config.storage.path;
+
+  if (!existsSync(path)) {
+    console.error(`❌ No database at ${path}`);
+    process.exit(1);
+  }
+
+  const db = new Database(path);
+  db.pragma('journal_mode = WAL');
+
+  const hasEvidenceTable = db.prepare(
+    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pattern_evidence'"
+  ).get();
+  if (!hasEvidenceTable) {
+    console.error('❌ Database predates the pattern_evidence table; start the ACE server once to upgrade it');
+    process.exit(1);
+  }
+
+  console.error(`🔄 Compacting ${path} (${config.storage.compression})...`);
+  const report = compactValues(db, config);
+  db.close();
+
+  console.error(`✅ Rewrote ${report.rows_rewritten} of ${report.evidence_rows + report.metadata_rows} values`);
+  console.error(`   Values: ${formatBytes(report.bytes_before)} → ${formatBytes(report.bytes_after)} (saved ${formatBytes(report.bytes_saved)})`);
+  console.error(`   File:   ${formatBytes(report.file_bytes_before)} → ${formatBytes(report.file_bytes_after)}`);
+
+  console.log(JSON.stringify(report, null, 2));
+}
+
+main();
@@ -8,6 +8,16 @@ export interface ACEConfig {
   storage: {
     type: 'local' | 'github' | 'remote';
     path: string;
+
+    // Opt-in: evidence and metadata values of at least `compression_min_bytes`
+    // are stored compressed (existing rows are rewritten by `npm run compact`).
+    // Compressed rows can only be read by versions that support compression.
+    compression: 'none' | 'deflate' | 'brotli';
+    compression_min_bytes: number;
+
+    // Writes (including consecutive curate runs) arriving within this
+    // window are committed in one transaction (ms)
+    write_window_ms: number;
   };
   ace: {
     // ACE Paper: 85% semantic similarity threshold for deduplication
@@ -30,6 +40,50 @@ export interface ACEConfig {
 
     // Context window threshold for lazy deduplication
     context_window_threshold: number;
+
+    // Max patterns retrieved for a task-filtered playbook
+    playbook_top_k: number;
+
+    // Evidence kept per pattern, and which entries to evict beyond the limit
+    evidence_limit: number;
+    evidence_policy: 'newest' | 'diverse';
+  };
+  embeddings: {
+    // Sentence transformer used for pattern vectors (stored with each vector)
+    model: string;
+
+    // Max texts per padded forward pass when embedding in batches
+    batch_size: number;
+
+    // How long the embedding queue waits to collect a batch (ms)
+    batch_window_ms: number;
+
+    // Worker threads running the model (0 = run on the main event loop)
+    workers: number;
+
+    // Background re-embedding after a model change (rows per batch, pause between batches)
+    migration_batch_size: number;
+    migration_delay_ms: number;
+
+    // LRU cache of text embeddings (entry count and memory limits)
+    query_cache_size: number;
+    query_cache_max_mb: number;
+
+    // Vector index: exact flat scan or approximate HNSW graph
+    index: 'flat' | 'hnsw';
+
+    // Flat index vector encoding: float32, or int8 codes with exact rescoring
+    quantization: 'none' | 'int8';
+    quantization_rescore_margin: number;
+
+    // Flat index PCA projection (0 = off), fitted on stored vectors
+    pca_dims: number;
+    pca_rescore_margin: number;
+
+    // HNSW graph parameters (one graph per domain, persisted under .ace-memory/)
+    hnsw_m: number;
+    hnsw_ef_construction: number;
+    hnsw_ef_search: number;
   };
 }
 
@@ -38,6 +92,9 @@ export function getConfig(): ACEConfig {
     storage: {
       type: (process.env.ACE_STORAGE_TYPE as any) || 'local',
       path: process.env.ACE_STORAGE_PATH || '.ace-memory/patterns.db',
+      compression: (process.env.ACE_COMPRESSION as any) || 'none',
+      compression_min_bytes: parseInt(process.env.ACE_COMPRESSION_MIN_BYTES || '256', 10),
+      write_window_ms: parseInt(process.env.ACE_WRITE_WINDOW_MS || '5', 10),
     },
     ace: {
       similarity_threshold: parseFloat(process.env.ACE_SIMILARITY_THRESHOLD || '0.85'),
@@ -47,6 +104,27 @@ export function getConfig(): ACEConfig {
       deduplication_strategy: (process.env.ACE_DEDUP_STRATEGY as any) || 'lazy',
       batch_size: parseInt(process.env.ACE_BATCH_SIZE || '5', 10),
       context_window_threshold: parseInt(process.env.ACE_CONTEXT_THRESHOLD || '100000', 10),
+      playbook_top_k: parseInt(process.env.ACE_PLAYBOOK_TOP_K || '50', 10),
+      evidence_limit: parseInt(process.env.ACE_EVIDENCE_LIMIT || '20', 10),
+      evidence_policy: (process.env.ACE_EVIDENCE_POLICY as any) || 'newest',
+    },
+    embeddings: {
+      model: process.env.ACE_EMBEDDING_MODEL || 'Xenova/all-MiniLM-L6-v2',
+      batch_size: parseInt(process.env.ACE_EMBEDDING_BATCH_SIZE || '64', 10),
+      batch_window_ms: parseInt(process.env.ACE_EMBEDDING_BATCH_WINDOW_MS || '5', 10),
+      workers: parseInt(process.env.ACE_EMBEDDING_WORKERS || '1', 10),
+      migration_batch_size: parseInt(process.env.ACE_MIGRATION_BATCH_SIZE || '32', 10),
+      migration_delay_ms: parseInt(process.env.ACE_MIGRATION_DELAY_MS || '200', 10),
+      query_cache_size: parseInt(process.env.ACE_QUERY_CACHE_SIZE || '1000', 10),
+      query_cache_max_mb: parseFloat(process.env.ACE_QUERY_CACHE_MAX_MB || '16'),
+      index: (process.env.ACE_VECTOR_INDEX as any) || 'flat',
+      quantization: (process.env.ACE_VECTOR_QUANTIZATION as any) || 'none',
+      quantization_rescore_margin: parseFloat(process.env.ACE_QUANTIZATION_MARGIN || '0.05'),
+      pca_dims: parseInt(process.env.ACE_PCA_DIMS || '0', 10),
+      pca_rescore_margin: parseFloat(process.env.ACE_PCA_MARGIN || '0.05'),
+      hnsw_m: parseInt(process.env.ACE_HNSW_M || '16', 10),
+      hnsw_ef_construction: parseInt(process.env.ACE_HNSW_EF_CONSTRUCTION || '200', 10),
+      hnsw_ef_search: parseInt(process.env.ACE_HNSW_EF_SEARCH || '64', 10),
     },
   };
 }
@@ -10,6 +10,7 @@
 import { Pattern, Insight } from '../types.js';
 import { ACEConfig } from '../config.js';
 import { ACEStorage } from '../storage/index.js';
+import { dotProduct } from '../embeddings/vector-index.js';
 import { randomBytes } from 'crypto';
 
 export class Curator {
@@ -52,41 +53,61 @@ export class Curator {
    * ACE paper: Incremental delta updates, not monolithic rewrites
    */
   async curate(insights: Insight[], existingPatterns?: Pattern[]): Promise<Pattern[]> {
-    const patterns = existingPatterns || await this.storage.getAllPatterns();
-    const newPatterns: Pattern[] = [];
-
-    for (const insight of insights) {
-      // Check if similar pattern exists (85% threshold)
-      const similar = await this.storage.findSimilarPatterns(
-        insight.description,
-        this.config.ace.similarity_threshold
+    // Wait for the model outside the exclusive section so other writes keep flowing
+    await this.storage.whenReady();
+
+    // Exclusive: concurrent curate runs would otherwise read the same matches
+    // and both insert the same new pattern. Batch vectors are reused across
+    // awaits, so also hold off model switch-over.
+    return this.storage.exclusive(() =>
+      this.storage.withEmbeddingLease(() => this.curateInsights(insights, existingPatterns))
+    );
+  }
+
+  private async curateInsights(insights: Insight[], existingPatterns?: Pattern[]): Promise<Pattern[]> {
+    // Only patterns below the pruning threshold can be pruned without a merge
+    const pruneCandidates: Array<Pick<Pattern, 'id' | 'confidence' | 'observations' | 'harmful'>> =
+      existingPatterns || await this.storage.getPatternsByConfidence(
+        0,
+        this.config.ace.confidence_threshold_medium,
+        undefined,
+        ['id', 'confidence', 'observations', 'harmful']
       );
+    const threshold = this.config.ace.similarity_threshold;
+
+    // Embed all insights in batched forward passes; each vector is reused
+    // for both the similarity lookup and the insert
+    const embeddings = await this.storage.embedBatch(
+      insights.map(insight => insight.description)
+    );
 
-      if (similar.length > 0) {
-        // Merge with existing pattern
-        const existing = similar[0].pattern;
+    // Nothing is written until the whole batch is curated: touched patterns
+    // are tracked here, and new ones are matched against the batch itself
+    const touched = new Map<string, Pattern>();
+    const created: Array<{ pattern: Pattern; embedding: Float32Array }> = [];
+    const evidence: Array<{ id: string; evidence: string }> = [];
 
-        // Update observations (helpful/harmful counters)
-        const observations = existing.observations + (insight.helpful ? 1 : 0);
-        const harmful = existing.harmful + (insight.harmful ? 1 : 0);
-        const total = observations + harmful;
+    for (const [i, insight] of insights.entries()) {
+      // Check if similar pattern exists (85% threshold); only the best match is merged
+      const [stored] = await this.storage.findTopKPatternsByEmbedding(embeddings[i], 1, threshold);
 
-        // Recalculate confidence
-        const confidence = total > 0 ? observations / total : 0;
+      let best = stored
+        ? { pattern: touched.get(stored.pattern.id) || stored.pattern, similarity: stored.similarity }
+        : null;
 
-        // Add evidence
-        const evidence = [...existing.evidence];
-        if (insight.evidence && !evidence.includes(insight.evidence)) {
-          evidence.push(insight.evidence);
+      for (const { pattern, embedding } of created) {
+        const similarity = dotProduct(embeddings[i], embedding);
+        if (similarity >= threshold && (!best || similarity > best.similarity)) {
+          best = { pattern: touched.get(pattern.id)!, similarity };
         }
+      }
 
-        await this.storage.updatePattern(existing.id, {
-          observations,
-          harmful,
-          confidence,
-          evidence,
-          updated_at: new Date().toISOString(),
-        });
+      if (best) {
+        // Merge with existing pattern; evidence is appended (deduplicated by storage)
+        touched.set(best.pattern.id, this.mergeInsight(best.pattern, insight));
+        if (insight.evidence) {
+          evidence.push({ id: best.pattern.id, evidence: insight.evidence });
+        }
       } else {
         // Create new pattern
         const pattern: Pattern = {
@@ -102,13 +123,35 @@ export class Curator {
           updated_at: new Date().toISOString(),
         };
 
-        newPatterns.push(pattern);
-        await this.storage.addPattern(pattern);
+        created.push({ pattern, embedding: embeddings[i] });
+        touched.set(pattern.id, pattern);
+      }
+    }
+
+    // Prune low-confidence patterns (ACE paper: 30% threshold), as merged in this batch
+    const pruned = new Set<string>();
+    for (const pattern of [...pruneCandidates, ...touched.values()]) {
+      if (this.shouldPrune(touched.get(pattern.id) || pattern)) {
+        pruned.add(pattern.id);
       }
     }
 
-    // Prune low-confidence patterns (ACE paper: 30% threshold)
-    await this.prune();
+    const createdIds = new Set(created.map(c => c.pattern.id));
+
+    // One transaction for the whole batch; vector index updated after commit
+    await this.storage.applyBatch({
+      inserts: created
+        .filter(({ pattern }) => !pruned.has(pattern.id))
+        .map(({ pattern, embedding }) => ({ pattern: touched.get(pattern.id)!, embedding })),
+      updates: Array.from(touched.values())
+        .filter(pattern => !createdIds.has(pattern.id) && !pruned.has(pattern.id))
+        .map(({ id, observations, harmful, confidence, updated_at }) => ({
+          id,
+          updates: { observations, harmful, confidence, updated_at },
+        })),
+      evidence: evidence.filter(({ id }) => !pruned.has(id)),
+      deletes: Array.from(pruned).filter(id => !createdIds.has(id)),
+    });
 
     // Deduplicate if needed (lazy strategy)
     if (this.config.ace.deduplication_strategy === 'proactive') {
@@ -119,80 +162,121 @@ export class Curator {
   }
 
   /**
-   * Prune low-confidence patterns
+   * Fold an insight's helpful/harmful signal into a pattern
+   */
+  private mergeInsight(existing: Pattern, insight: Insight): Pattern {
+    // Update observations (helpful/harmful counters)
+    const observations = existing.observations + (insight.helpful ? 1 : 0);
+    const harmful = existing.harmful + (insight.harmful ? 1 : 0);
+    const total = observations + harmful;
+
+    // Recalculate confidence
+    const confidence = total > 0 ? observations / total : 0;
+
+    return {
+      ...existing,
+      observations,
+      harmful,
+      confidence,
+      updated_at: new Date().toISOString(),
+    };
+  }
+
+  /**
+   * Prune if confidence < 30% and has at least 5 observations
    *
    * ACE paper: 30% confidence threshold for pruning
    */
-  private async prune(): Promise<void> {
-    const patterns = await this.storage.getAllPatterns();
-    const threshold = this.config.ace.confidence_threshold_medium;
-
-    for (const pattern of patterns) {
-      // Prune if confidence < 30% and has at least 5 observations
-      if (pattern.confidence < threshold && (pattern.observations + pattern.harmful) >= 5) {
-        await this.storage.deletePattern(pattern.id);
-      }
-    }
+  private shouldPrune(pattern: Pick<Pattern, 'confidence' | 'observations' | 'harmful'>): boolean {
+    return pattern.confidence < this.config.ace.confidence_threshold_medium &&
+      (pattern.observations + pattern.harmful) >= 5;
   }
 
   /**
    * Deduplicate similar patterns
    *
-   * ACE paper: 85% similarity threshold, grow-and-refine
+   * ACE paper: 85% similarity threshold, grow-and-refine.
+   * Runs one pass per domain, each scanning only that domain's vectors.
    */
   private async deduplicate(): Promise<void> {
-    const patterns = await this.storage.getAllPatterns();
+    const { domains } = await this.storage.getStats();
+
+    for (const domain of domains) {
+      await this.deduplicateDomain(domain);
+    }
+  }
+
+  private async deduplicateDomain(domain: string): Promise<void> {
+    const patterns = await this.storage.getPatternsByDomain(domain);
     const processed = new Set<string>();
 
+    // Written in one transaction at the end of the pass
+    const merged = new Map<string, Pattern>();
+    const deleted = new Set<string>();
+    const evidence = new Map<string, string[]>(); // Appended to each surviving primary
+
     for (const pattern of patterns) {
       if (processed.has(pattern.id)) continue;
 
-      // Find similar patterns
-      const similar = await this.storage.findSimilarPatterns(
+      // Find similar patterns in the same domain (as merged so far in this pass)
+      const similar = (await this.storage.findSimilarPatterns(
         pattern.content,
-        this.config.ace.similarity_threshold
-      );
+        this.config.ace.similarity_threshold,
+        domain
+      ))
+        .filter(s => !deleted.has(s.pattern.id))
+        .map(s => merged.get(s.pattern.id) || s.pattern);
 
       if (similar.length > 1) {
         // Merge similar patterns
-        const primary = similar[0].pattern;
+        const primary = similar[0];
         const duplicates = similar.slice(1);
 
-        // Accumulate observations and evidence
+        // Accumulate observations and evidence (duplicates are dropped by storage)
         let totalObservations = primary.observations;
         let totalHarmful = primary.harmful;
-        const mergedEvidence = [...primary.evidence];
+        const appended = evidence.get(primary.id) ?? [];
 
-        for (const { pattern: dup } of duplicates) {
+        for (const dup of duplicates) {
           totalObservations += dup.observations;
           totalHarmful += dup.harmful;
-
-          for (const evidence of dup.evidence) {
-            if (!mergedEvidence.includes(evidence)) {
-              mergedEvidence.push(evidence);
-            }
-          }
+          appended.push(...dup.evidence, ...(evidence.get(dup.id) ?? []));
 
           // Delete duplicate
-          await this.storage.deletePattern(dup.id);
+          deleted.add(dup.id);
+          merged.delete(dup.id);
+          evidence.delete(dup.id);
           processed.add(dup.id);
         }
 
+        evidence.set(primary.id, appended);
+
         // Update primary pattern
         const total = totalObservations + totalHarmful;
         const confidence = total > 0 ? totalObservations / total : 0;
 
-        await this.storage.updatePattern(primary.id, {
+        merged.set(primary.id, {
+          ...primary,
           observations: totalObservations,
           harmful: totalHarmful,
           confidence,
-          evidence: mergedEvidence,
           updated_at: new Date().toISOString(),
         });
 
         processed.add(primary.id);
       }
     }
+
+    await this.storage.applyBatch({
+      updates: Array.from(merged.values()).map(({ id, observations, harmful, confidence, updated_at }) => ({
+        id,
+        updates: { observations, harmful, confidence, updated_at },
+      })),
+      evidence: Array.from(evidence).flatMap(([id, entries]) =>
+        entries.map(content => ({ id, evidence: content }))
+      ),
+      deletes: Array.from(deleted),
+    });
   }
 
   /**
@@ -201,24 +285,29 @@ export class Curator {
    * ACE paper: 70% confidence threshold for constitution
    */
   async getConstitution(): Promise<Pattern[]> {
-    const patterns = await this.storage.getAllPatterns();
-    return patterns.filter(
-      p => p.confidence >= this.config.ace.confidence_threshold_high
-    );
+    return await this.storage.getConstitutionPatterns();
   }
 
   /**
    * Format patterns as playbook
    *
-   * ACE paper Figure 3 format: structured sections with bullet IDs
+   * ACE paper Figure 3 format: structured sections with bullet IDs.
+   * A domain restricts the playbook (and task retrieval) to that domain.
    */
-  async formatPlaybook(taskHint?: string): Promise<string> {
+  async formatPlaybook(taskHint?: string, domain?: string): Promise<string> {
     let patterns: Pattern[];
 
     if (taskHint) {
-      // Retrieve relevant patterns based on task
-      const similar = await this.storage.findSimilarPatterns(taskHint, 0.5);
+      // Retrieve the most relevant patterns for the task
+      const similar = await this.storage.findTopKPatterns(
+        taskHint,
+        this.config.ace.playbook_top_k,
+        0.5,
+        domain
+      );
       patterns = similar.map(s => s.pattern);
+    } else if (domain) {
+      patterns = await this.storage.getPatternsByDomain(domain);
     } else {
       patterns = await this.storage.getAllPatterns();
     }
@@ -0,0 +1,119 @@
+/**
+ * ACE Embedding Batcher
+ *
+ * Micro-batching queue in front of the embedding pipeline. Requests arriving
+ * within a short window (or until the batch is full) share one forward pass.
+ * Up to `maxInFlight` batches run at once (one per embedding worker).
+ */
+
+export interface BatcherStats {
+  queue_depth: number;      // Requests currently waiting
+  max_queue_depth: number;  // Highest queue depth observed
+  batches: number;          // Forward passes run
+  items: number;            // Texts embedded
+  avg_batch_size: number;
+  max_batch_size: number;   // Largest batch observed
+}
+
+interface PendingRequest {
+  text: string;
+  resolve: (embedding: Float32Array) => void;
+  reject: (error: unknown) => void;
+}
+
+export class EmbeddingBatcher {
+  private run: (texts: string[]) => Promise<Float32Array[]>;
+  private windowMs: number;
+  private maxBatchSize: number;
+  private maxInFlight: number;
+  private pending: PendingRequest[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private inFlight = 0;
+  private stats = { max_queue_depth: 0, batches: 0, items: 0, max_batch_size: 0 };
+
+  constructor(
+    run: (texts: string[]) => Promise<Float32Array[]>,
+    windowMs: number,
+    maxBatchSize: number,
+    maxInFlight = 1
+  ) {
+    this.run = run;
+    this.windowMs = windowMs;
+    this.maxBatchSize = Math.max(1, maxBatchSize);
+    this.maxInFlight = Math.max(1, maxInFlight);
+  }
+
+  /**
+   * Queue a text and resolve with its embedding once its batch has run
+   */
+  embed(text: string): Promise<Float32Array> {
+    return new Promise((resolve, reject) => {
+      this.pending.push({ text, resolve, reject });
+      this.stats.max_queue_depth = Math.max(this.stats.max_queue_depth, this.pending.length);
+      this.schedule();
+    });
+  }
+
+  /**
+   * Whether requests are waiting or a batch is running
+   */
+  isBusy(): boolean {
+    return this.pending.length > 0 || this.inFlight > 0;
+  }
+
+  getStats(): BatcherStats {
+    return {
+      queue_depth: this.pending.length,
+      max_queue_depth: this.stats.max_queue_depth,
+      batches: this.stats.batches,
+      items: this.stats.items,
+      avg_batch_size: this.stats.batches > 0 ? this.stats.items / this.stats.batches : 0,
+      max_batch_size: this.stats.max_batch_size,
+    };
+  }
+
+  private schedule(): void {
+    // A finishing batch drains the queue once a slot frees up
+    if (this.inFlight >= this.maxInFlight) return;
+
+    if (this.pending.length >= this.maxBatchSize) {
+      void this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => void this.flush(), this.windowMs);
+    }
+  }
+
+  private async flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    if (this.inFlight >= this.maxInFlight || this.pending.length === 0) return;
+
+    this.inFlight++;
+    const batch = this.pending.splice(0, this.maxBatchSize);
+
+    // Leftover requests may fill another free slot
+    if (this.pending.length > 0) {
+      this.schedule();
+    }
+
+    try {
+      const embeddings = await this.run(batch.map(request => request.text));
+      batch.forEach((request, i) => request.resolve(embeddings[i]));
+    } catch (error) {
+      batch.forEach(request => request.reject(error));
+    } finally {
+      this.stats.batches++;
+      this.stats.items += batch.length;
+      this.stats.max_batch_size = Math.max(this.stats.max_batch_size, batch.length);
+      this.inFlight--;
+    }
+
+    // Requests that arrived during the forward pass have already waited
+    if (this.pending.length > 0) {
+      void this.flush();
+    }
+  }
+}
@@ -0,0 +1,320 @@
+/**
+ * ACE HNSW Vector Index
+ *
+ * Approximate nearest-neighbour search using hnswlib-node.
+ * The graph is persisted next to patterns.db so startup reads it from disk
+ * instead of re-inserting every vector. Saves are debounced and synchronous,
+ * so the graph never changes mid-write; graphs with unsaved changes are also
+ * written when the process exits.
+ */
+
+import { existsSync, readFileSync, rmSync, writeFileSync } from 'fs';
+import { createRequire } from 'module';
+import type { HierarchicalNSW } from 'hnswlib-node';
+import { SimilarityResult, VectorIndex } from './vector-index.js';
+
+const require = createRequire(import.meta.url);
+
+// Delay between the last mutation and writing the index to disk
+const SAVE_DELAY_MS = 1000;
+
+// Initial neighbour count for threshold searches (doubled as needed)
+const INITIAL_K = 16;
+
+// Graphs changed since their last save, flushed on shutdown
+const unsaved = new Set<HnswIndex>();
+let exitHooksInstalled = false;
+
+function flushUnsaved(): void {
+  for (const index of Array.from(unsaved)) {
+    try {
+      index.saveSync();
+    } catch (error) {
+      console.error('⚠️  Failed to save HNSW index:', error);
+    }
+  }
+}
+
+/**
+ * Save pending graphs before the process goes away
+ *
+ * The debounce timer is unref'd, so without this a change made less than
+ * SAVE_DELAY_MS before exit would never reach disk.
+ */
+function installExitHooks(): void {
+  if (exitHooksInstalled) return;
+  exitHooksInstalled = true;
+
+  process.on('beforeExit', flushUnsaved);
+  for (const signal of ['SIGINT', 'SIGTERM'] as const) {
+    process.once(signal, () => {
+      flushUnsaved();
+      // Our listener is gone: re-raise for the default exit
+      process.kill(process.pid, signal);
+    });
+  }
+}
+
+export interface HnswOptions {
+  path: string;            // Index file (label map is stored at `${path}.json`)
+  modelId: string;         // Index is discarded if the embedding model changes
+  m: number;               // Max graph connections per node
+  efConstruction: number;  // Candidate list size while building
+  efSearch: number;        // Candidate list size while querying
+  syncedThrough: () => string; // Newest pattern updated_at applied to the engine's vectors
+}
+
+interface HnswMetadata {
+  model: string;
+  dim: number;
+  nextLabel: number;
+  labels: Record<string, number>;
+  syncedThrough?: string;  // Patterns updated after this may hold a newer vector
+}
+
+export class HnswIndex implements VectorIndex {
+  private options: HnswOptions;
+  private HNSW!: typeof HierarchicalNSW;
+  private index: HierarchicalNSW | null = null;
+  private dim = 0;
+  private labels = new Map<string, number>();
+  private ids = new Map<number, string>();
+  private nextLabel = 0;
+  private saveTimer: NodeJS.Timeout | null = null;
+  private restored = '';
+
+  constructor(options: HnswOptions) {
+    this.options = options;
+  }
+
+  async load(): Promise<void> {
+    const { path, modelId } = this.options;
+    const metaPath = `${path}.json`;
+
+    if (!existsSync(path) || !existsSync(metaPath)) {
+      return;
+    }
+
+    try {
+      const meta: HnswMetadata = JSON.parse(readFileSync(metaPath, 'utf-8'));
+
+      if (meta.model !== modelId) {
+        console.error(`⚠️  HNSW index built with ${meta.model}, rebuilding for ${modelId}`);
+        return;
+      }
+
+      const index = new (this.hnswlib())('cosine', meta.dim);
+      await index.readIndex(path, true);
+      index.setEf(this.options.efSearch);
+
+      this.index = index;
+      this.dim = meta.dim;
+      this.nextLabel = meta.nextLabel;
+      this.restored = meta.syncedThrough ?? '';
+      for (const [id, label] of Object.entries(meta.labels)) {
+        this.labels.set(id, label);
+        this.ids.set(label, id);
+      }
+
+      console.error(`✅ Loaded HNSW index (${this.labels.size} vectors)`);
+    } catch (error) {
+      console.error('⚠️  Failed to load HNSW index, rebuilding:', error);
+      this.reset();
+    }
+  }
+
+  add(id: string, embedding: Float32Array): void {
+    if (!this.index) {
+      this.createIndex(embedding.length);
+    }
+    const index = this.index!;
+
+    const existing = this.labels.get(id);
+    if (existing !== undefined) {
+      // Re-adding an existing label replaces its vector
+      index.addPoint(embedding, existing);
+    } else {
+      if (index.getCurrentCount() >= index.getMaxElements()) {
+        index.resizeIndex(index.getMaxElements() * 2);
+      }
+
+      const label = this.nextLabel++;
+      index.addPoint(embedding, label, true);
+      this.labels.set(id, label);
+      this.ids.set(label, id);
+    }
+
+    this.scheduleSave();
+  }
+
+  remove(id: string): void {
+    const label = this.labels.get(id);
+    if (label === undefined || !this.index) return;
+
+    this.index.markDelete(label);
+    this.labels.delete(id);
+    this.ids.delete(label);
+
+    this.scheduleSave();
+  }
+
+  has(id: string): boolean {
+    return this.labels.has(id);
+  }
+
+  keys(): string[] {
+    return Array.from(this.labels.keys());
+  }
+
+  retain(ids: Set<string>): void {
+    for (const id of Array.from(this.labels.keys())) {
+      if (!ids.has(id)) {
+        this.remove(id);
+      }
+    }
+  }
+
+  search(query: Float32Array, threshold: number): SimilarityResult[] {
+    if (!this.index || this.labels.size === 0) {
+      return [];
+    }
+
+    // Widen the search until the farthest neighbour falls below threshold
+    let k = Math.min(INITIAL_K, this.labels.size);
+
+    while (true) {
+      const { distances, neighbors } = this.index.searchKnn(query, k);
+      const results: SimilarityResult[] = [];
+
+      for (let i = 0; i < neighbors.length; i++) {
+        // Cosine space: distance = 1 - similarity
+        const similarity = 1 - distances[i];
+        if (similarity >= threshold) {
+          results.push({ id: this.ids.get(neighbors[i])!, similarity });
+        }
+      }
+
+      if (results.length < k || k >= this.labels.size) {
+        return results.sort((a, b) => b.similarity - a.similarity);
+      }
+
+      k = Math.min(k * 2, this.labels.size);
+    }
+  }
+
+  topK(query: Float32Array, k: number, minSimilarity: number): SimilarityResult[] {
+    if (!this.index || this.labels.size === 0 || k <= 0) {
+      return [];
+    }
+
+    const { distances, neighbors } = this.index.searchKnn(query, Math.min(k, this.labels.size));
+    const results: SimilarityResult[] = [];
+
+    for (let i = 0; i < neighbors.length; i++) {
+      // Cosine space: distance = 1 - similarity
+      const similarity = 1 - distances[i];
+      if (similarity >= minSimilarity) {
+        results.push({ id: this.ids.get(neighbors[i])!, similarity });
+      }
+    }
+
+    return results.sort((a, b) => b.similarity - a.similarity);
+  }
+
+  clear(): void {
+    this.reset();
+    this.scheduleSave();
+  }
+
+  size(): number {
+    return this.labels.size;
+  }
+
+  restoredThrough(): string {
+    return this.restored;
+  }
+
+  drop(): void {
+    this.cancelSave();
+    this.reset();
+    rmSync(this.options.path, { force: true });
+    rmSync(`${this.options.path}.json`, { force: true });
+  }
+
+  /**
+   * Write the index and label map to disk
+   *
+   * Synchronous on purpose: hnswlib's async writeIndex reads the graph on a
+   * worker thread while add() may grow it (resizeIndex reallocates), and
+   * labels added mid-write would be missing from the saved label map.
+   */
+  saveSync(): void {
+    this.cancelSave();
+    if (!this.index) return;
+
+    const meta = this.metadata();
+    this.index.writeIndexSync(this.options.path);
+    writeFileSync(`${this.options.path}.json`, JSON.stringify(meta));
+  }
+
+  private metadata(): HnswMetadata {
+    return {
+      model: this.options.modelId,
+      dim: this.dim,
+      nextLabel: this.nextLabel,
+      labels: Object.fromEntries(this.labels),
+      syncedThrough: this.options.syncedThrough(),
+    };
+  }
+
+  private cancelSave(): void {
+    if (this.saveTimer) {
+      clearTimeout(this.saveTimer);
+      this.saveTimer = null;
+    }
+    unsaved.delete(this);
+  }
+
+  /**
+   * Native addon: only loaded once an HNSW index is actually used
+   */
+  private hnswlib(): typeof HierarchicalNSW {
+    if (!this.HNSW) {
+      this.HNSW = (require('hnswlib-node') as typeof import('hnswlib-node')).HierarchicalNSW;
+    }
+    return this.HNSW;
+  }
+
+  private createIndex(dim: number): void {
+    this.index = new (this.hnswlib())('cosine', dim);
+    this.index.initIndex(1024, this.options.m, this.options.efConstruction, 100, true);
+    this.index.setEf(this.options.efSearch);
+    this.dim = dim;
+  }
+
+  private reset(): void {
+    this.index = null;
+    this.dim = 0;
+    this.labels.clear();
+    this.ids.clear();
+    this.nextLabel = 0;
+    this.restored = '';
+  }
+
+  private scheduleSave(): void {
+    if (this.saveTimer) return;
+
+    unsaved.add(this);
+    installExitHooks();
+
+    this.saveTimer = setTimeout(() => {
+      this.saveTimer = null;
+      try {
+        this.saveSync();
+      } catch (error) {
+        console.error('⚠️  Failed to save HNSW index:', error);
+      }
+    }, SAVE_DELAY_MS);
+    this.saveTimer.unref();
+  }
+}
@@ -6,119 +6,367 @@
  */
 
 import { pipeline, env } from '@xenova/transformers';
+import { dirname, join } from 'path';
 import { Pattern } from '../types.js';
 import { ACEConfig } from '../config.js';
+import { ExactVectorSource, FlatIndex, VectorIndex } from './vector-index.js';
+import { PartitionedIndex } from './partitioned-index.js';
+import { HnswIndex } from './hnsw-index.js';
+import { QuantizedIndex } from './quantized-index.js';
+import { PcaProjection, ProjectedIndex } from './pca.js';
+import { BatcherStats, EmbeddingBatcher } from './batcher.js';
+import { EmbeddingWorkerPool } from './worker-pool.js';
+import { QueryCacheStats, QueryEmbeddingCache } from './query-cache.js';
 
 // Disable local model caching for now (can enable for production)
 env.cacheDir = './.cache/transformers';
 
-interface EmbeddingCache {
-  [patternId: string]: number[];
-}
-
 export class EmbeddingsEngine {
   private extractor: any;
-  private cache: EmbeddingCache = {};
+  private pool: EmbeddingWorkerPool | null = null;
+  private index: PartitionedIndex;
+  private pendingIndex: PartitionedIndex | null = null; // Being built by applyProjection
+  private projection: PcaProjection | null = null;
+  private exactSource: ExactVectorSource | null = null;
+  private batcher: EmbeddingBatcher;
+  private queryCache: QueryEmbeddingCache;
+  private syncedThrough = '';
   private config: ACEConfig;
+  private model: string;
 
-  constructor(config: ACEConfig) {
+  /**
+   * @param model Embedding model (defaults to `embeddings.model`; a different
+   *              one is used to keep serving old vectors during a migration)
+   */
+  constructor(config: ACEConfig, model: string = config.embeddings.model) {
     this.config = config;
+    this.model = model;
+    this.index = new PartitionedIndex(domain => this.createPartition(domain));
+    this.batcher = new EmbeddingBatcher(
+      texts => this.runBatch(texts),
+      config.embeddings.batch_window_ms,
+      config.embeddings.batch_size,
+      Math.max(1, config.embeddings.workers)
+    );
+    this.queryCache = new QueryEmbeddingCache(
+      model,
+      config.embeddings.query_cache_size,
+      config.embeddings.query_cache_max_mb * 1024 * 1024
+    );
+  }
+
+  /**
+   * Create one domain's partition with the configured index type
+   */
+  private createPartition(domain: string): VectorIndex {
+    let index = this.createIndex(domain);
+
+    if (this.projection && !(index instanceof HnswIndex)) {
+      index = new ProjectedIndex(index, this.projection, this.config.embeddings.pca_rescore_margin);
+    }
+
+    if (this.exactSource && (index instanceof QuantizedIndex || index instanceof ProjectedIndex)) {
+      index.setExactSource(this.exactSource);
+    }
+
+    return index;
+  }
+
+  /**
+   * Create the configured vector index
+   */
+  private createIndex(domain: string): VectorIndex {
+    const { embeddings } = this.config;
+
+    if (embeddings.index === 'hnsw') {
+      // One graph file per model and domain so a migration never overwrites the live one
+      const slug = (name: string) => name.replace(/[^\w.-]+/g, '_');
+      return new HnswIndex({
+        path: join(dirname(this.config.storage.path), `patterns.${slug(this.model)}.${slug(domain)}.hnsw`),
+        modelId: this.model,
+        m: embeddings.hnsw_m,
+        efConstruction: embeddings.hnsw_ef_construction,
+        efSearch: embeddings.hnsw_ef_search,
+        syncedThrough: () => this.syncedThrough,
+      });
+    }
+
+    if (embeddings.quantization === 'int8') {
+      return new QuantizedIndex(embeddings.quantization_rescore_margin);
+    }
+
+    return new FlatIndex();
+  }
+
+  /**
+   * Scan PCA-projected vectors instead of full ones
+   *
+   * Flat indexes only (HNSW persists its own vectors). Must be called
+   * before any vectors are loaded; see applyProjection otherwise.
+   */
+  setProjection(projection: PcaProjection): void {
+    if (this.config.embeddings.index === 'hnsw') return;
+
+    this.projection = projection;
+  }
+
+  /**
+   * Switch already loaded partitions to a PCA projection without pausing searches
+   *
+   * The current partitions keep serving while `fill` loads every stored
+   * vector into projected ones (it may yield between chunks); vectors added
+   * or removed meanwhile are applied to both. The projected partitions
+   * replace the current ones once `fill` resolves.
+   */
+  async applyProjection(
+    projection: PcaProjection,
+    fill: (add: (id: string, embedding: Float32Array, domain: string) => void) => Promise<void>
+  ): Promise<void> {
+    if (this.config.embeddings.index === 'hnsw') return;
+
+    // Partitions created from here on (either index) are projected
+    this.projection = projection;
+    const next = new PartitionedIndex(domain => this.createPartition(domain));
+    this.pendingIndex = next;
+
+    try {
+      await fill((id, embedding, domain) => next.add(domain, id, embedding));
+      this.index = next;
+    } finally {
+      this.pendingIndex = null;
+    }
+  }
+
+  /**
+   * Apply a vector change to the serving index and any index being built
+   */
+  private mutate(fn: (index: PartitionedIndex) => void): void {
+    fn(this.index);
+    if (this.pendingIndex) fn(this.pendingIndex);
+  }
+
+  /**
+   * Set where full-precision vectors are read for int8/PCA rescoring
+   */
+  setExactVectorSource(source: ExactVectorSource): void {
+    this.exactSource = source;
+    this.index.forEachPartition(index => {
+      if (index instanceof QuantizedIndex || index instanceof ProjectedIndex) {
+        index.setExactSource(source);
+      }
+    });
   }
 
   async initialize(): Promise<void> {
-    console.error('🔄 Loading sentence transformer model (all-MiniLM-L6-v2)...');
+    const workers = this.config.embeddings.workers;
+    console.error(`🔄 Loading sentence transformer model (${this.modelId})...`);
 
     // Load sentence transformer model
-    // Same model as Python: sentence-transformers/all-MiniLM-L6-v2
-    this.extractor = await pipeline(
-      'feature-extraction',
-      'Xenova/all-MiniLM-L6-v2'
-    );
+    // Default matches Python: sentence-transformers/all-MiniLM-L6-v2
+    if (workers > 0) {
+      // Off the main event loop, one pipeline per worker thread
+      this.pool = new EmbeddingWorkerPool(this.modelId, workers);
+      await this.pool.initialize();
+    } else {
+      this.extractor = await pipeline(
+        'feature-extraction',
+        this.modelId
+      );
+    }
 
-    console.error('✅ Embeddings engine initialized');
+    console.error(`✅ Embeddings engine initialized (${this.config.embeddings.index} index)`);
+  }
+
+  /**
+   * Open the partitions of known domains, restoring persisted state (HNSW graphs)
+   */
+  async openPartitions(domains: string[]): Promise<void> {
+    await Promise.all(domains.map(domain => this.index.open(domain)));
+  }
+
+  /**
+   * Model that produced the vectors in this engine (persisted with each vector)
+   */
+  get modelId(): string {
+    return this.model;
+  }
+
+  /**
+   * Whether embedding requests are queued or running
+   */
+  isBusy(): boolean {
+    return this.batcher.isBusy();
+  }
+
+  /**
+   * Stop worker threads (after this engine is replaced by a migration)
+   */
+  async dispose(): Promise<void> {
+    await this.pool?.terminate();
   }
 
   /**
    * Generate embedding for text
+   *
+   * Served from the query cache when possible, otherwise queued so
+   * concurrent callers share one batched forward pass.
    */
-  private async getEmbedding(text: string): Promise<number[]> {
-    const output = await this.extractor(text, {
-      pooling: 'mean',
-      normalize: true,
-    });
+  async getEmbedding(text: string): Promise<Float32Array> {
+    const cached = this.queryCache.get(text);
+    if (cached) return cached;
 
-    return Array.from(output.data);
+    const embedding = await this.batcher.embed(text);
+    this.queryCache.set(text, embedding);
+    return embedding;
   }
 
   /**
-   * Calculate cosine similarity between two vectors
-   * ACE paper uses cosine similarity with 85% threshold
+   * Generate embeddings for many texts
+   *
+   * Texts are queued together and run as padded batches of up to
+   * `embeddings.batch_size` instead of one forward pass each.
    */
-  private cosineSimilarity(a: number[], b: number[]): number {
-    if (a.length !== b.length) {
-      throw new Error('Vectors must have same length');
-    }
+  async embedBatch(texts: string[]): Promise<Float32Array[]> {
+    return Promise.all(texts.map(text => this.getEmbedding(text)));
+  }
 
-    let dotProduct = 0;
-    let normA = 0;
-    let normB = 0;
+  /**
+   * Run one padded forward pass over a batch of texts
+   */
+  private async runBatch(texts: string[]): Promise<Float32Array[]> {
+    let data: Float32Array;
+    let dim: number;
+
+    if (this.pool) {
+      ({ data, dim } = await this.pool.run(texts));
+    } else {
+      const output = await this.extractor(texts, {
+        pooling: 'mean',
+        normalize: true,
+      });
+
+      // Output tensor is [batch, dim]
+      dim = output.dims[output.dims.length - 1];
+      data = output.data as Float32Array;
+    }
 
-    for (let i = 0; i < a.length; i++) {
-      dotProduct += a[i] * b[i];
-      normA += a[i] * a[i];
-      normB += b[i] * b[i];
+    // Zero-copy: each embedding is a view into the batch output
+    const embeddings: Float32Array[] = [];
+    for (let i = 0; i < texts.length; i++) {
+      embeddings.push(data.subarray(i * dim, (i + 1) * dim));
     }
 
-    return dotProduct / (Math.sqrt(normA) * Math.sqrt(normB));
+    return embeddings;
+  }
+
+  /**
+   * Embedding queue metrics (for tuning window and batch size)
+   */
+  getQueueStats(): BatcherStats {
+    return this.batcher.getStats();
+  }
+
+  /**
+   * Query embedding cache metrics
+   */
+  getQueryCacheStats(): QueryCacheStats {
+    return this.queryCache.getStats();
   }
 
   /**
-   * Add pattern to vector store
+   * Load a previously persisted embedding without running the model
    */
-  async addPattern(pattern: Pattern): Promise<void> {
-    const embedding = await this.getEmbedding(pattern.content);
-    this.cache[pattern.id] = embedding;
+  loadEmbedding(id: string, embedding: Float32Array, domain: string): void {
+    this.mutate(index => index.add(domain, id, embedding));
   }
 
   /**
-   * Update pattern in vector store
+   * Whether a vector restored from disk is still current for a pattern
+   * last updated at `updatedAt` (false if the pattern changed after the save)
    */
-  async updatePattern(pattern: Pattern): Promise<void> {
-    const embedding = await this.getEmbedding(pattern.content);
-    this.cache[pattern.id] = embedding;
+  hasCurrentEmbedding(id: string, domain: string, updatedAt: string): boolean {
+    return this.index.has(id, domain) && updatedAt <= this.index.restoredThrough(domain);
+  }
+
+  /**
+   * Record that every pattern change up to `updatedAt` is in the vector store
+   *
+   * Persisted with HNSW graphs so the next startup knows which rows to re-add.
+   */
+  markSynced(updatedAt: string): void {
+    if (updatedAt > this.syncedThrough) {
+      this.syncedThrough = updatedAt;
+    }
+  }
+
+  /**
+   * Drop vectors for patterns that no longer exist
+   */
+  retainEmbeddings(ids: Set<string>): void {
+    this.mutate(index => index.retain(ids));
   }
 
   /**
    * Delete pattern from vector store
    */
   async deletePattern(id: string): Promise<void> {
-    delete this.cache[id];
+    this.mutate(index => index.remove(id));
   }
 
   /**
    * Find similar patterns using semantic similarity
    *
-   * ACE paper: 85% similarity threshold for deduplication
+   * ACE paper: 85% similarity threshold for deduplication.
+   * With a domain, only that domain's partition is scanned.
    */
   async findSimilar(
     content: string,
-    threshold: number
+    threshold: number,
+    domain?: string
   ): Promise<Array<{ id: string; similarity: number }>> {
     const queryEmbedding = await this.getEmbedding(content);
-    const results: Array<{ id: string; similarity: number }> = [];
 
-    for (const [id, embedding] of Object.entries(this.cache)) {
-      const similarity = this.cosineSimilarity(queryEmbedding, embedding);
+    return this.findSimilarByEmbedding(queryEmbedding, threshold, domain);
+  }
 
-      if (similarity >= threshold) {
-        results.push({ id, similarity });
-      }
-    }
+  /**
+   * Find similar patterns for an already computed query embedding
+   */
+  findSimilarByEmbedding(
+    embedding: Float32Array,
+    threshold: number,
+    domain?: string
+  ): Array<{ id: string; similarity: number }> {
+    return this.index.search(embedding, threshold, domain);
+  }
 
-    // Sort by similarity descending
-    results.sort((a, b) => b.similarity - a.similarity);
+  /**
+   * Find the k most similar patterns with similarity >= minSimilarity
+   *
+   * Keeps a fixed-size heap during the scan instead of collecting and
+   * sorting every match.
+   */
+  async findTopK(
+    content: string,
+    k: number,
+    minSimilarity: number,
+    domain?: string
+  ): Promise<Array<{ id: string; similarity: number }>> {
+    const queryEmbedding = await this.getEmbedding(content);
+
+    return this.findTopKByEmbedding(queryEmbedding, k, minSimilarity, domain);
+  }
 
-    return results;
+  /**
+   * Find the k most similar patterns for an already computed query embedding
+   */
+  findTopKByEmbedding(
+    embedding: Float32Array,
+    k: number,
+    minSimilarity: number,
+    domain?: string
+  ): Array<{ id: string; similarity: number }> {
+    return this.index.topK(embedding, k, minSimilarity, domain);
   }
 
   /**
@@ -131,8 +379,8 @@ export class EmbeddingsEngine {
     const threshold = this.config.ace.similarity_threshold; // 0.85
 
     for (const pattern of patterns) {
-      // Check if similar pattern already exists
-      const similar = await this.findSimilar(pattern.content, threshold);
+      // Check if similar pattern already exists in the same domain
+      const similar = await this.findSimilar(pattern.content, threshold, pattern.domain);
 
       // Find if any similar pattern is already in unique set
       const existingIndex = unique.findIndex(
@@ -163,16 +411,23 @@ export class EmbeddingsEngine {
   }
 
   /**
-   * Clear all embeddings
+   * Clear all embeddings, deleting persisted partitions (HNSW files)
    */
   async clear(): Promise<void> {
-    this.cache = {};
+    this.mutate(index => index.clear());
   }
 
   /**
    * Get cache size
    */
   getCacheSize(): number {
-    return Object.keys(this.cache).length;
+    return this.index.size();
+  }
+
+  /**
+   * Vector count per domain partition
+   */
+  getPartitionSizes(): Record<string, number> {
+    return this.index.getPartitionSizes();
   }
 }
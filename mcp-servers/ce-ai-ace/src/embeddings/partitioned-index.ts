@@ -0,0 +1,170 @@
+/**
+ * ACE Partitioned Vector Index
+ *
+ * One VectorIndex per pattern domain, so domain-scoped lookups only scan
+ * their own partition. Unscoped lookups search every partition (the global
+ * view) and merge the results. Partitions are created when a domain gets
+ * its first vector and dropped when its last vector is removed.
+ */
+
+import { SimilarityResult, VectorIndex } from './vector-index.js';
+import { TopKHeap } from './top-k.js';
+
+export type PartitionFactory = (domain: string) => VectorIndex;
+
+export class PartitionedIndex {
+  private factory: PartitionFactory;
+  private partitions = new Map<string, VectorIndex>();
+  private domains = new Map<string, string>(); // id → domain
+
+  constructor(factory: PartitionFactory) {
+    this.factory = factory;
+  }
+
+  /**
+   * Create a domain's partition and restore its persisted state (HNSW)
+   */
+  async open(domain: string): Promise<void> {
+    if (this.partitions.has(domain)) return;
+
+    const partition = this.factory(domain);
+    await partition.load();
+    this.partitions.set(domain, partition);
+
+    // Record ids restored from disk so they can be moved or removed
+    for (const id of partition.keys()) {
+      this.domains.set(id, domain);
+    }
+  }
+
+  add(domain: string, id: string, embedding: Float32Array): void {
+    const previous = this.domains.get(id);
+    if (previous !== undefined && previous !== domain) {
+      // Pattern moved to another domain
+      this.remove(id);
+    }
+
+    let partition = this.partitions.get(domain);
+    if (!partition) {
+      partition = this.factory(domain);
+      this.partitions.set(domain, partition);
+    }
+
+    partition.add(id, embedding);
+    this.domains.set(id, domain);
+  }
+
+  remove(id: string): void {
+    const domain = this.domains.get(id);
+    if (domain === undefined) return;
+
+    this.domains.delete(id);
+    const partition = this.partitions.get(domain);
+    if (!partition) return;
+
+    partition.remove(id);
+    if (partition.size() === 0) {
+      this.dropPartition(domain);
+    }
+  }
+
+  has(id: string, domain?: string): boolean {
+    return domain === undefined ? this.domains.has(id) : this.domains.get(id) === domain;
+  }
+
+  /**
+   * Newest pattern change a domain's restored partition reflects ('' if none)
+   */
+  restoredThrough(domain: string): string {
+    return this.partitions.get(domain)?.restoredThrough?.() ?? '';
+  }
+
+  /**
+   * Drop every entry whose id is not in the given set
+   */
+  retain(ids: Set<string>): void {
+    for (const id of Array.from(this.domains.keys())) {
+      if (!ids.has(id)) {
+        this.remove(id);
+      }
+    }
+
+    // Partitions restored from disk may hold nothing live
+    for (const [domain, partition] of this.partitions) {
+      if (partition.size() === 0) {
+        this.dropPartition(domain);
+      }
+    }
+  }
+
+  /**
+   * Search one domain's partition, or all of them when no domain is given
+   */
+  search(query: Float32Array, threshold: number, domain?: string): SimilarityResult[] {
+    if (domain !== undefined) {
+      return this.partitions.get(domain)?.search(query, threshold) ?? [];
+    }
+
+    const results: SimilarityResult[] = [];
+    for (const partition of this.partitions.values()) {
+      results.push(...partition.search(query, threshold));
+    }
+
+    // Sort by similarity descending
+    results.sort((a, b) => b.similarity - a.similarity);
+
+    return results;
+  }
+
+  /**
+   * The k most similar entries in one domain, or across all partitions
+   */
+  topK(query: Float32Array, k: number, minSimilarity: number, domain?: string): SimilarityResult[] {
+    if (domain !== undefined) {
+      return this.partitions.get(domain)?.topK(query, k, minSimilarity) ?? [];
+    }
+
+    const heap = new TopKHeap(k);
+    for (const partition of this.partitions.values()) {
+      for (const { id, similarity } of partition.topK(query, k, minSimilarity)) {
+        heap.push(id, similarity);
+      }
+    }
+
+    return heap.results();
+  }
+
+  clear(): void {
+    for (const domain of Array.from(this.partitions.keys())) {
+      this.dropPartition(domain);
+    }
+    this.domains.clear();
+  }
+
+  size(): number {
+    return this.domains.size;
+  }
+
+  /**
+   * Vector count per domain partition
+   */
+  getPartitionSizes(): Record<string, number> {
+    const sizes: Record<string, number> = {};
+    for (const [domain, partition] of this.partitions) {
+      sizes[domain] = partition.size();
+    }
+    return sizes;
+  }
+
+  /**
+   * Run `fn` on every open partition (e.g. to set the exact vector source)
+   */
+  forEachPartition(fn: (partition: VectorIndex) => void): void {
+    this.partitions.forEach(fn);
+  }
+
+  private dropPartition(domain: string): void {
+    this.partitions.get(domain)?.drop();
+    this.partitions.delete(domain);
+  }
+}
@@ -0,0 +1,247 @@
+/**
+ * ACE PCA Projection
+ *
+ * Optional dimensionality reduction for pattern vectors (e.g. 384 → 128).
+ * Components are the top eigenvectors of the uncentered second-moment matrix,
+ * which best preserves dot products (cosine similarity of normalized vectors).
+ */
+
+import { SimilarityResult, VectorIndex, ExactVectorSource, RESCORE_LIMIT, rescoreExact } from './vector-index.js';
+
+// Subspace iterations when fitting (converges well before this for embeddings)
+const FIT_ITERATIONS = 30;
+
+// Work between yields in fitAsync: sample vectors accumulated, components
+// multiplied per subspace iteration (a few ms each at 384 dims)
+const FIT_CHUNK_VECTORS = 16;
+const FIT_CHUNK_COMPONENTS = 8;
+
+export class PcaProjection {
+  readonly inputDim: number;
+  readonly outputDim: number;
+  private components: Float32Array; // [outputDim, inputDim] row-major
+
+  constructor(components: Float32Array, inputDim: number, outputDim: number) {
+    this.components = components;
+    this.inputDim = inputDim;
+    this.outputDim = outputDim;
+  }
+
+  /**
+   * Fit a projection onto the top `outputDim` principal directions
+   */
+  static fit(vectors: Float32Array[], outputDim: number): PcaProjection {
+    const steps = PcaProjection.fitSteps(vectors, outputDim);
+    let step = steps.next();
+    while (!step.done) step = steps.next();
+    return step.value;
+  }
+
+  /**
+   * Same as fit, yielding to the event loop between chunks of work so
+   * requests keep being served meanwhile
+   */
+  static async fitAsync(vectors: Float32Array[], outputDim: number): Promise<PcaProjection> {
+    const steps = PcaProjection.fitSteps(vectors, outputDim);
+    let step = steps.next();
+    while (!step.done) {
+      await new Promise(resolve => setImmediate(resolve));
+      step = steps.next();
+    }
+    return step.value;
+  }
+
+  /**
+   * The fit as resumable steps: yields after each chunk of sample vectors
+   * and of components in each subspace iteration
+   */
+  private static *fitSteps(vectors: Float32Array[], outputDim: number): Generator<void, PcaProjection> {
+    const dim = vectors[0].length;
+    const k = Math.min(outputDim, dim);
+
+    // Second-moment matrix C = (1/n) Σ v vᵀ (upper triangle, then mirrored)
+    const cov = new Float64Array(dim * dim);
+    for (const [n, v] of vectors.entries()) {
+      if (n > 0 && n % FIT_CHUNK_VECTORS === 0) yield;
+      for (let i = 0; i < dim; i++) {
+        const vi = v[i];
+        const row = i * dim;
+        for (let j = i; j < dim; j++) {
+          cov[row + j] += vi * v[j];
+        }
+      }
+    }
+    for (let i = 0; i < dim; i++) {
+      for (let j = i; j < dim; j++) {
+        const value = cov[i * dim + j] / vectors.length;
+        cov[i * dim + j] = value;
+        cov[j * dim + i] = value;
+      }
+    }
+
+    // Subspace iteration: Q ← orthonormalize(C Q)
+    let basis = new Float64Array(k * dim);
+    for (let i = 0; i < basis.length; i++) {
+      basis[i] = Math.sin(i * 12.9898 + 78.233); // Deterministic start
+    }
+    orthonormalize(basis, k, dim);
+
+    for (let iter = 0; iter < FIT_ITERATIONS; iter++) {
+      const next = new Float64Array(k * dim);
+      for (let c = 0; c < k; c++) {
+        if (c % FIT_CHUNK_COMPONENTS === 0) yield;
+        const q = c * dim;
+        for (let i = 0; i < dim; i++) {
+          let sum = 0;
+          const row = i * dim;
+          for (let j = 0; j < dim; j++) {
+            sum += cov[row + j] * basis[q + j];
+          }
+          next[q + i] = sum;
+        }
+      }
+      orthonormalize(next, k, dim);
+      basis = next;
+    }
+
+    return new PcaProjection(Float32Array.from(basis), dim, k);
+  }
+
+  /**
+   * Project and re-normalize a vector
+   */
+  project(vector: Float32Array): Float32Array {
+    const { components, inputDim, outputDim } = this;
+    const projected = new Float32Array(outputDim);
+    let norm = 0;
+
+    for (let c = 0, offset = 0; c < outputDim; c++, offset += inputDim) {
+      let sum = 0;
+      for (let i = 0; i < inputDim; i++) {
+        sum += components[offset + i] * vector[i];
+      }
+      projected[c] = sum;
+      norm += sum * sum;
+    }
+
+    norm = Math.sqrt(norm);
+    if (norm > 0) {
+      for (let c = 0; c < outputDim; c++) {
+        projected[c] /= norm;
+      }
+    }
+
+    return projected;
+  }
+
+  /**
+   * Components matrix as a Float32 BLOB
+   */
+  serialize(): Buffer {
+    return Buffer.from(this.components.buffer, this.components.byteOffset, this.components.byteLength);
+  }
+
+  static deserialize(blob: Buffer, inputDim: number, outputDim: number): PcaProjection {
+    // Copy: the components outlive the row buffer and must be aligned
+    const components = new Float32Array(new Uint8Array(blob).buffer);
+    if (components.length !== inputDim * outputDim) {
+      throw new Error('Projection matrix size does not match its dimensions');
+    }
+    return new PcaProjection(components, inputDim, outputDim);
+  }
+}
+
+/**
+ * Modified Gram-Schmidt over `k` row vectors of length `dim`
+ */
+function orthonormalize(rows: Float64Array, k: number, dim: number): void {
+  for (let a = 0; a < k; a++) {
+    const ra = a * dim;
+    for (let b = 0; b < a; b++) {
+      const rb = b * dim;
+      let dot = 0;
+      for (let i = 0; i < dim; i++) dot += rows[ra + i] * rows[rb + i];
+      for (let i = 0; i < dim; i++) rows[ra + i] -= dot * rows[rb + i];
+    }
+
+    let norm = 0;
+    for (let i = 0; i < dim; i++) norm += rows[ra + i] * rows[ra + i];
+    norm = Math.sqrt(norm) || 1;
+    for (let i = 0; i < dim; i++) rows[ra + i] /= norm;
+  }
+}
+
+/**
+ * ProjectedIndex - Scans PCA-projected vectors in an inner index
+ *
+ * Candidates within `margin` of the threshold are rescored against the
+ * full-dimensional vectors in patterns.db when an exact source is set.
+ */
+export class ProjectedIndex implements VectorIndex {
+  private inner: VectorIndex;
+  private projection: PcaProjection;
+  private margin: number;
+  private exactSource: ExactVectorSource | null = null;
+
+  constructor(inner: VectorIndex, projection: PcaProjection, margin: number) {
+    this.inner = inner;
+    this.projection = projection;
+    this.margin = margin;
+  }
+
+  setExactSource(source: ExactVectorSource): void {
+    this.exactSource = source;
+  }
+
+  load(): Promise<void> {
+    return this.inner.load();
+  }
+
+  add(id: string, embedding: Float32Array): void {
+    this.inner.add(id, this.projection.project(embedding));
+  }
+
+  remove(id: string): void {
+    this.inner.remove(id);
+  }
+
+  has(id: string): boolean {
+    return this.inner.has(id);
+  }
+
+  keys(): string[] {
+    return this.inner.keys();
+  }
+
+  retain(ids: Set<string>): void {
+    this.inner.retain(ids);
+  }
+
+  search(query: Float32Array, threshold: number): SimilarityResult[] {
+    const candidates = this.inner.search(this.projection.project(query), threshold - this.margin);
+    return rescoreExact(candidates, query, threshold, this.exactSource);
+  }
+
+  topK(query: Float32Array, k: number, minSimilarity: number): SimilarityResult[] {
+    // Keep enough projected candidates that rescoring can reorder them
+    const candidates = this.inner.topK(
+      this.projection.project(query),
+      Math.max(k, RESCORE_LIMIT),
+      minSimilarity - this.margin
+    );
+
+    return rescoreExact(candidates, query, minSimilarity, this.exactSource).slice(0, k);
+  }
+
+  clear(): void {
+    this.inner.clear();
+  }
+
+  size(): number {
+    return this.inner.size();
+  }
+
+  drop(): void {
+    this.inner.drop();
+  }
+}
@@ -0,0 +1,204 @@
+/**
+ * ACE Int8 Quantized Vector Index
+ *
+ * Keeps each vector as int8 codes plus one float scale (~4x smaller than
+ * float32) and scores with integer dot products. Candidates near the
+ * threshold are rescored against the full-precision vectors persisted in
+ * patterns.db, so Curator merge decisions match the float32 index.
+ */
+
+import { ExactVectorSource, RESCORE_LIMIT, SimilarityResult, VectorIndex, rescoreExact } from './vector-index.js';
+import { TopKHeap } from './top-k.js';
+
+// Initial row capacity of the code matrix (doubled as needed)
+const INITIAL_CAPACITY = 256;
+
+/**
+ * Symmetric per-vector scalar quantization to int8
+ */
+export function quantizeInt8(
+  vector: ArrayLike<number>,
+  codes: Int8Array,
+  offset = 0
+): number {
+  let maxAbs = 0;
+  for (let i = 0; i < vector.length; i++) {
+    const abs = Math.abs(vector[i]);
+    if (abs > maxAbs) maxAbs = abs;
+  }
+
+  const scale = maxAbs > 0 ? maxAbs / 127 : 1;
+  for (let i = 0; i < vector.length; i++) {
+    codes[offset + i] = Math.round(vector[i] / scale);
+  }
+
+  return scale;
+}
+
+export class QuantizedIndex implements VectorIndex {
+  private margin: number;
+  private exactSource: ExactVectorSource | null = null;
+  private dim = 0;
+  private codes = new Int8Array(0);
+  private scales = new Float32Array(0);
+  private rows = new Map<string, number>();
+  private ids: string[] = [];
+
+  /**
+   * @param margin Candidates scoring >= threshold - margin are rescored exactly
+   */
+  constructor(margin: number) {
+    this.margin = margin;
+  }
+
+  /**
+   * Set where full-precision vectors are read from for rescoring
+   */
+  setExactSource(source: ExactVectorSource): void {
+    this.exactSource = source;
+  }
+
+  async load(): Promise<void> {
+    // Nothing persisted: vectors are loaded from patterns.db
+  }
+
+  add(id: string, embedding: Float32Array): void {
+    if (this.dim === 0) {
+      this.dim = embedding.length;
+    } else if (embedding.length !== this.dim) {
+      throw new Error('Vectors must have same length');
+    }
+
+    let row = this.rows.get(id);
+    if (row === undefined) {
+      row = this.ids.length;
+      this.ensureCapacity(row + 1);
+      this.rows.set(id, row);
+      this.ids.push(id);
+    }
+
+    this.scales[row] = quantizeInt8(embedding, this.codes, row * this.dim);
+  }
+
+  remove(id: string): void {
+    const row = this.rows.get(id);
+    if (row === undefined) return;
+
+    // Swap-remove: move the last row into the freed slot
+    const last = this.ids.length - 1;
+    if (row !== last) {
+      const dim = this.dim;
+      this.codes.copyWithin(row * dim, last * dim, (last + 1) * dim);
+      this.scales[row] = this.scales[last];
+
+      const movedId = this.ids[last];
+      this.ids[row] = movedId;
+      this.rows.set(movedId, row);
+    }
+
+    this.ids.pop();
+    this.rows.delete(id);
+  }
+
+  has(id: string): boolean {
+    return this.rows.has(id);
+  }
+
+  keys(): string[] {
+    return this.ids.slice();
+  }
+
+  retain(ids: Set<string>): void {
+    for (const id of this.ids.slice()) {
+      if (!ids.has(id)) {
+        this.remove(id);
+      }
+    }
+  }
+
+  search(query: Float32Array, threshold: number): SimilarityResult[] {
+    const candidates = this.scan(query, threshold - this.margin, Infinity);
+
+    // Rescore every candidate at full precision
+    return rescoreExact(candidates, query, threshold, this.exactSource);
+  }
+
+  topK(query: Float32Array, k: number, minSimilarity: number): SimilarityResult[] {
+    // Keep enough approximate candidates that rescoring can reorder them
+    const candidates = this.scan(query, minSimilarity - this.margin, Math.max(k, RESCORE_LIMIT));
+
+    return rescoreExact(candidates, query, minSimilarity, this.exactSource).slice(0, k);
+  }
+
+  clear(): void {
+    this.dim = 0;
+    this.codes = new Int8Array(0);
+    this.scales = new Float32Array(0);
+    this.rows.clear();
+    this.ids = [];
+  }
+
+  size(): number {
+    return this.ids.length;
+  }
+
+  drop(): void {
+    this.clear();
+  }
+
+  /**
+   * Approximate bytes held by codes and scales
+   */
+  byteSize(): number {
+    return this.ids.length * (this.dim + 4);
+  }
+
+  /**
+   * Integer dot products against every row
+   *
+   * Returns up to `limit` rows scoring >= cutoff, sorted descending.
+   */
+  private scan(query: Float32Array, cutoff: number, limit: number): SimilarityResult[] {
+    const { dim, codes, scales, ids } = this;
+
+    if (ids.length > 0 && query.length !== dim) {
+      throw new Error('Vectors must have same length');
+    }
+
+    const queryCodes = new Int8Array(dim);
+    const queryScale = quantizeInt8(query, queryCodes);
+    const heap = new TopKHeap(limit);
+
+    for (let row = 0, offset = 0; row < ids.length; row++, offset += dim) {
+      let dot = 0;
+      for (let i = 0; i < dim; i++) {
+        dot += codes[offset + i] * queryCodes[i];
+      }
+
+      const similarity = dot * queryScale * scales[row];
+      if (similarity >= cutoff && heap.accepts(similarity)) {
+        heap.push(ids[row], similarity);
+      }
+    }
+
+    return heap.results();
+  }
+
+  /**
+   * Grow the code matrix (doubling) to hold at least `rows` vectors
+   */
+  private ensureCapacity(rows: number): void {
+    const capacity = this.scales.length;
+    if (rows <= capacity) return;
+
+    const newCapacity = Math.max(INITIAL_CAPACITY, capacity * 2, rows);
+
+    const codes = new Int8Array(newCapacity * this.dim);
+    codes.set(this.codes.subarray(0, this.ids.length * this.dim));
+    this.codes = codes;
+
+    const scales = new Float32Array(newCapacity);
+    scales.set(this.scales.subarray(0, this.ids.length));
+    this.scales = scales;
+  }
+}
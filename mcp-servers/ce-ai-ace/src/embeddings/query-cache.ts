@@ -0,0 +1,102 @@
+/**
+ * ACE Query Embedding Cache
+ *
+ * Bounded LRU of text → embedding, keyed by a hash of the model id and the
+ * normalized text, so repeated task hints, insight descriptions and dedup
+ * lookups skip the forward pass.
+ */
+
+import { createHash } from 'crypto';
+
+export interface QueryCacheStats {
+  entries: number;
+  bytes: number;       // Approximate memory held by cached vectors
+  hits: number;
+  misses: number;
+  evictions: number;
+  hit_rate: number;
+}
+
+// Per-entry overhead beyond the vector (hash key, Map entry)
+const ENTRY_OVERHEAD_BYTES = 128;
+
+export class QueryEmbeddingCache {
+  private entries = new Map<string, Float32Array>();
+  private maxEntries: number;
+  private maxBytes: number;
+  private modelId: string;
+  private bytes = 0;
+  private stats = { hits: 0, misses: 0, evictions: 0 };
+
+  constructor(modelId: string, maxEntries: number, maxBytes: number) {
+    this.modelId = modelId;
+    this.maxEntries = maxEntries;
+    this.maxBytes = maxBytes;
+  }
+
+  get(text: string): Float32Array | undefined {
+    const key = this.key(text);
+    const embedding = this.entries.get(key);
+
+    if (embedding === undefined) {
+      this.stats.misses++;
+      return undefined;
+    }
+
+    // Move to most-recently-used position
+    this.entries.delete(key);
+    this.entries.set(key, embedding);
+    this.stats.hits++;
+    return embedding;
+  }
+
+  set(text: string, embedding: Float32Array): void {
+    if (this.maxEntries <= 0) return;
+
+    const key = this.key(text);
+    const existing = this.entries.get(key);
+    if (existing !== undefined) {
+      this.entries.delete(key);
+      this.bytes -= this.sizeOf(existing);
+    }
+
+    // Batch outputs are views into a shared buffer; keep only our slice alive
+    if (embedding.byteLength !== embedding.buffer.byteLength) {
+      embedding = embedding.slice();
+    }
+
+    this.entries.set(key, embedding);
+    this.bytes += this.sizeOf(embedding);
+
+    // Evict least-recently-used entries until within both limits
+    while (this.entries.size > this.maxEntries || this.bytes > this.maxBytes) {
+      const [oldestKey, oldest] = this.entries.entries().next().value!;
+      this.entries.delete(oldestKey);
+      this.bytes -= this.sizeOf(oldest);
+      this.stats.evictions++;
+    }
+  }
+
+  getStats(): QueryCacheStats {
+    const lookups = this.stats.hits + this.stats.misses;
+
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      hits: this.stats.hits,
+      misses: this.stats.misses,
+      evictions: this.stats.evictions,
+      hit_rate: lookups > 0 ? this.stats.hits / lookups : 0,
+    };
+  }
+
+  private key(text: string): string {
+    // Whitespace runs tokenize identically, so collapse them
+    const normalized = text.normalize('NFC').trim().replace(/\s+/g, ' ');
+    return createHash('sha256').update(this.modelId).update('\0').update(normalized).digest('hex');
+  }
+
+  private sizeOf(embedding: Float32Array): number {
+    return embedding.byteLength + ENTRY_OVERHEAD_BYTES;
+  }
+}
@@ -0,0 +1,75 @@
+/**
+ * ACE Top-K Heap
+ *
+ * Fixed-size min-heap keeping the k most similar results of a scan, so
+ * callers that need a few best matches never sort the full result set.
+ */
+
+import { SimilarityResult } from './vector-index.js';
+
+export class TopKHeap {
+  private k: number;
+  private heap: SimilarityResult[] = [];
+
+  constructor(k: number) {
+    this.k = Math.max(0, k);
+  }
+
+  /**
+   * Whether a result with this similarity would be kept
+   */
+  accepts(similarity: number): boolean {
+    return this.heap.length < this.k || (this.k > 0 && similarity > this.heap[0].similarity);
+  }
+
+  push(id: string, similarity: number): void {
+    if (!this.accepts(similarity)) return;
+
+    const heap = this.heap;
+    if (heap.length < this.k) {
+      heap.push({ id, similarity });
+      this.siftUp(heap.length - 1);
+    } else {
+      // Replace the current minimum
+      heap[0] = { id, similarity };
+      this.siftDown(0);
+    }
+  }
+
+  size(): number {
+    return this.heap.length;
+  }
+
+  /**
+   * Kept results, sorted by similarity descending
+   */
+  results(): SimilarityResult[] {
+    return this.heap.slice().sort((a, b) => b.similarity - a.similarity);
+  }
+
+  private siftUp(i: number): void {
+    const heap = this.heap;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (heap[parent].similarity <= heap[i].similarity) break;
+      [heap[parent], heap[i]] = [heap[i], heap[parent]];
+      i = parent;
+    }
+  }
+
+  private siftDown(i: number): void {
+    const heap = this.heap;
+    while (true) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let smallest = i;
+
+      if (left < heap.length && heap[left].similarity < heap[smallest].similarity) smallest = left;
+      if (right < heap.length && heap[right].similarity < heap[smallest].similarity) smallest = right;
+      if (smallest === i) return;
+
+      [heap[smallest], heap[i]] = [heap[i], heap[smallest]];
+      i = smallest;
+    }
+  }
+}
@@ -0,0 +1,249 @@
+/**
+ * ACE Vector Indexes
+ *
+ * Storage and lookup of pattern embeddings for the Embeddings Engine.
+ * FlatIndex does an exact scan; QuantizedIndex (quantized-index.ts) scans
+ * int8 codes with exact rescoring; HnswIndex (hnsw-index.ts) is approximate;
+ * ProjectedIndex (pca.ts) scans PCA-reduced vectors with exact rescoring.
+ */
+
+import { TopKHeap } from './top-k.js';
+
+export interface SimilarityResult {
+  id: string;
+  similarity: number;
+}
+
+/**
+ * Reads full-precision vectors (from patterns.db) for exact rescoring
+ */
+export type ExactVectorSource = (ids: string[]) => Map<string, Float32Array>;
+
+/**
+ * VectorIndex - Pluggable vector store behind EmbeddingsEngine
+ */
+export interface VectorIndex {
+  // Restore persisted state (if any) before embeddings are loaded
+  load(): Promise<void>;
+
+  add(id: string, embedding: Float32Array): void;
+  remove(id: string): void;
+  has(id: string): boolean;
+  keys(): string[];
+
+  // Drop every entry whose id is not in the given set
+  retain(ids: Set<string>): void;
+
+  // All entries with similarity >= threshold, sorted descending
+  search(query: Float32Array, threshold: number): SimilarityResult[];
+
+  // The k most similar entries with similarity >= minSimilarity, sorted descending
+  topK(query: Float32Array, k: number, minSimilarity: number): SimilarityResult[];
+
+  clear(): void;
+  size(): number;
+
+  // Persisted indexes: newest pattern updated_at the restored state reflects
+  restoredThrough?(): string;
+
+  // Release memory and delete persisted state (partition removed)
+  drop(): void;
+}
+
+/**
+ * Cosine similarity of two normalized vectors
+ */
+export function dotProduct(a: Float32Array, b: Float32Array): number {
+  let sum = 0;
+  for (let i = 0; i < a.length; i++) {
+    sum += a[i] * b[i];
+  }
+  return sum;
+}
+
+// Approximate candidates kept per top-k query so rescoring can reorder them
+export const RESCORE_LIMIT = 64;
+
+/**
+ * Rescore approximate candidates against full-precision vectors
+ *
+ * Every candidate is rescored, so no approximate (int8/PCA) score can pass
+ * the threshold on its own; candidates the source has no vector for (e.g.
+ * deleted since) are dropped. Without a source the approximate scores stand.
+ */
+export function rescoreExact(
+  candidates: SimilarityResult[],
+  query: Float32Array,
+  threshold: number,
+  source: ExactVectorSource | null
+): SimilarityResult[] {
+  if (source) {
+    const exact = source(candidates.map(c => c.id));
+
+    candidates = candidates.filter(candidate => {
+      const vector = exact.get(candidate.id);
+      if (!vector) return false;
+
+      let similarity = 0;
+      for (let i = 0; i < query.length; i++) {
+        similarity += vector[i] * query[i];
+      }
+      candidate.similarity = similarity;
+      return true;
+    });
+  }
+
+  const results = candidates.filter(c => c.similarity >= threshold);
+
+  // Sort by similarity descending
+  results.sort((a, b) => b.similarity - a.similarity);
+
+  return results;
+}
+
+// Initial row capacity of the flat matrix (doubled as needed)
+const INITIAL_CAPACITY = 256;
+
+/**
+ * FlatIndex - Exact scan over a contiguous row-major Float32Array matrix
+ *
+ * Vectors from the pipeline are already normalized, so cosine similarity
+ * reduces to a dot product against each row.
+ */
+export class FlatIndex implements VectorIndex {
+  private dim = 0;
+  private matrix = new Float32Array(0);
+  private rows = new Map<string, number>();
+  private ids: string[] = [];
+
+  async load(): Promise<void> {
+    // Nothing persisted: vectors are loaded from patterns.db
+  }
+
+  add(id: string, embedding: Float32Array): void {
+    if (this.dim === 0) {
+      this.dim = embedding.length;
+    } else if (embedding.length !== this.dim) {
+      throw new Error('Vectors must have same length');
+    }
+
+    let row = this.rows.get(id);
+    if (row === undefined) {
+      row = this.ids.length;
+      this.ensureCapacity(row + 1);
+      this.rows.set(id, row);
+      this.ids.push(id);
+    }
+
+    this.matrix.set(embedding, row * this.dim);
+  }
+
+  remove(id: string): void {
+    const row = this.rows.get(id);
+    if (row === undefined) return;
+
+    // Swap-remove: move the last row into the freed slot
+    const last = this.ids.length - 1;
+    if (row !== last) {
+      const dim = this.dim;
+      this.matrix.copyWithin(row * dim, last * dim, (last + 1) * dim);
+
+      const movedId = this.ids[last];
+      this.ids[row] = movedId;
+      this.rows.set(movedId, row);
+    }
+
+    this.ids.pop();
+    this.rows.delete(id);
+  }
+
+  has(id: string): boolean {
+    return this.rows.has(id);
+  }
+
+  keys(): string[] {
+    return this.ids.slice();
+  }
+
+  retain(ids: Set<string>): void {
+    for (const id of this.ids.slice()) {
+      if (!ids.has(id)) {
+        this.remove(id);
+      }
+    }
+  }
+
+  search(query: Float32Array, threshold: number): SimilarityResult[] {
+    const results: SimilarityResult[] = [];
+    const { dim, matrix, ids } = this;
+
+    if (ids.length > 0 && query.length !== dim) {
+      throw new Error('Vectors must have same length');
+    }
+
+    for (let row = 0, offset = 0; row < ids.length; row++, offset += dim) {
+      let similarity = 0;
+      for (let i = 0; i < dim; i++) {
+        similarity += matrix[offset + i] * query[i];
+      }
+
+      if (similarity >= threshold) {
+        results.push({ id: ids[row], similarity });
+      }
+    }
+
+    // Sort by similarity descending
+    results.sort((a, b) => b.similarity - a.similarity);
+
+    return results;
+  }
+
+  topK(query: Float32Array, k: number, minSimilarity: number): SimilarityResult[] {
+    const heap = new TopKHeap(k);
+    const { dim, matrix, ids } = this;
+
+    if (ids.length > 0 && query.length !== dim) {
+      throw new Error('Vectors must have same length');
+    }
+
+    for (let row = 0, offset = 0; row < ids.length; row++, offset += dim) {
+      let similarity = 0;
+      for (let i = 0; i < dim; i++) {
+        similarity += matrix[offset + i] * query[i];
+      }
+
+      if (similarity >= minSimilarity && heap.accepts(similarity)) {
+        heap.push(ids[row], similarity);
+      }
+    }
+
+    return heap.results();
+  }
+
+  clear(): void {
+    this.dim = 0;
+    this.matrix = new Float32Array(0);
+    this.rows.clear();
+    this.ids = [];
+  }
+
+  size(): number {
+    return this.ids.length;
+  }
+
+  drop(): void {
+    this.clear();
+  }
+
+  /**
+   * Grow the matrix (doubling) to hold at least `rows` vectors
+   */
+  private ensureCapacity(rows: number): void {
+    const capacity = this.matrix.length / this.dim;
+    if (rows <= capacity) return;
+
+    const grown = new Float32Array(Math.max(INITIAL_CAPACITY, capacity * 2, rows) * this.dim);
+    grown.set(this.matrix.subarray(0, this.ids.length * this.dim));
+    this.matrix = grown;
+  }
+}
@@ -0,0 +1,162 @@
+/**
+ * ACE Embedding Worker Pool
+ *
+ * Pool of worker_threads, each holding its own pipeline, so embedding never
+ * blocks stdio request handling and multi-core hosts embed in parallel.
+ */
+
+import { Worker } from 'worker_threads';
+
+export interface WorkerBatchResult {
+  data: Float32Array;  // Row-major [batch, dim]
+  dim: number;
+}
+
+interface Task {
+  texts: string[];
+  resolve: (result: WorkerBatchResult) => void;
+  reject: (error: unknown) => void;
+}
+
+interface PoolWorker {
+  worker: Worker;
+  task: Task | null;
+}
+
+export class EmbeddingWorkerPool {
+  private model: string;
+  private size: number;
+  private workers: PoolWorker[] = [];
+  private queue: Task[] = [];
+  private terminated = false;
+
+  constructor(model: string, size: number) {
+    this.model = model;
+    this.size = size;
+  }
+
+  async initialize(): Promise<void> {
+    const started = await Promise.allSettled(Array.from({ length: this.size }, () => this.spawn()));
+    const failure = started.find((result): result is PromiseRejectedResult => result.status === 'rejected');
+
+    if (failure) {
+      // Workers that did start must not outlive the failed pool
+      await this.terminate();
+      throw failure.reason;
+    }
+  }
+
+  /**
+   * Embed a batch of texts on the next idle worker
+   */
+  run(texts: string[]): Promise<WorkerBatchResult> {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ texts, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  async terminate(): Promise<void> {
+    this.terminated = true;
+    const workers = this.workers;
+    this.workers = [];
+
+    const error = new Error('Embedding worker pool terminated');
+    workers.forEach(({ task }) => task?.reject(error));
+    this.rejectQueued(error);
+
+    await Promise.all(workers.map(({ worker }) => worker.terminate()));
+  }
+
+  private dispatch(): void {
+    for (const slot of this.workers) {
+      if (this.queue.length === 0) return;
+      if (slot.task) continue;
+
+      slot.task = this.queue.shift()!;
+      slot.worker.postMessage(slot.task.texts);
+    }
+  }
+
+  private spawn(): Promise<void> {
+    return new Promise((resolve, reject) => {
+      const worker = new Worker(new URL('./worker.js', import.meta.url), {
+        workerData: { model: this.model },
+      });
+      const slot: PoolWorker = { worker, task: null };
+      let ready = false;
+
+      // Idle workers must not keep the server process alive
+      worker.unref();
+
+      worker.on('message', (message: any) => {
+        if (message.type === 'ready') {
+          if (this.terminated) {
+            // Restarted after the pool was terminated
+            void worker.terminate();
+            resolve();
+            return;
+          }
+
+          ready = true;
+          this.workers.push(slot);
+          resolve();
+          this.dispatch();
+          return;
+        }
+
+        const task = slot.task;
+        slot.task = null;
+
+        if (task) {
+          if (message.type === 'result') {
+            task.resolve({ data: new Float32Array(message.buffer), dim: message.dim });
+          } else {
+            task.reject(new Error(message.message));
+          }
+        }
+
+        this.dispatch();
+      });
+
+      // 'error' is followed by 'exit'; a worker can also exit without one
+      // (process.exit, out of memory), so both go through here once
+      let failed = false;
+      const fail = (error: Error) => {
+        if (failed) return;
+        failed = true;
+
+        if (!ready) {
+          reject(error);
+          return;
+        }
+
+        // Exited because the pool was terminated
+        if (this.terminated) return;
+
+        console.error('⚠️  Embedding worker crashed, restarting:', error);
+        slot.task?.reject(error);
+        slot.task = null;
+        this.workers = this.workers.filter(w => w !== slot);
+        this.spawn().catch(err => {
+          console.error('❌ Failed to restart embedding worker:', err);
+          if (this.workers.length === 0) {
+            this.rejectQueued(err);
+          }
+        });
+      };
+
+      worker.on('error', fail);
+      worker.on('exit', code => fail(new Error(`Embedding worker exited with code ${code}`)));
+    });
+  }
+
+  /**
+   * Fail queued batches that no worker is left to run
+   */
+  private rejectQueued(error: unknown): void {
+    const queue = this.queue;
+    this.queue = [];
+    queue.forEach(task => task.reject(error));
+  }
+}
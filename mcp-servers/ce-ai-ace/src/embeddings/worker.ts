@@ -0,0 +1,37 @@
+/**
+ * ACE Embedding Worker
+ *
+ * Runs the sentence transformer pipeline off the main event loop.
+ * Receives a batch of texts, replies with the pooled vectors as one
+ * transferable Float32 buffer.
+ */
+
+import { parentPort, workerData } from 'worker_threads';
+import { pipeline, env } from '@xenova/transformers';
+
+env.cacheDir = './.cache/transformers';
+
+const port = parentPort!;
+const extractor = await pipeline('feature-extraction', workerData.model);
+
+port.on('message', async (texts: string[]) => {
+  try {
+    const output = await extractor(texts, {
+      pooling: 'mean',
+      normalize: true,
+    });
+
+    // Output tensor is [batch, dim]; transfer only the bytes we own
+    const data = output.data as Float32Array;
+    const dim = output.dims[output.dims.length - 1];
+    const buffer = (data.byteOffset === 0 && data.byteLength === data.buffer.byteLength
+      ? data.buffer
+      : data.slice().buffer) as ArrayBuffer;
+
+    port.postMessage({ type: 'result', buffer, dim }, [buffer]);
+  } catch (error) {
+    port.postMessage({ type: 'error', message: (error as Error).message });
+  }
+});
+
+port.postMessage({ type: 'ready' });
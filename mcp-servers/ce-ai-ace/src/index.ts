@@ -38,6 +38,7 @@ async function main() {
   const config: ACEConfig = getConfig();
   const storage = new ACEStorage(config);
 
+  // Opens SQLite only; the embedding model keeps loading in the background
   await storage.initialize();
 
   console.error('🧠 ACE Pattern Learning MCP Server starting...');
@@ -54,6 +55,11 @@ async function main() {
   await server.connect(transport);
 
   console.error('🚀 ACE MCP Server ready for connections');
+
+  storage.whenReady().then(
+    () => console.error('🧠 Embeddings ready'),
+    () => { /* Logged by storage; embedding tools report the error */ }
+  );
 }
 
 main().catch((error) => {
@@ -33,11 +33,8 @@ export class Reflector {
       throw new Error('MCP server required for reflection (sampling)');
     }
 
-    // Get existing patterns for context (avoid rediscovery)
-    const existingPatterns = await this.storage.getAllPatterns();
-    const constitution = existingPatterns.filter(
-      p => p.confidence >= this.config.ace.confidence_threshold_high
-    );
+    // Get high-confidence patterns for context (avoid rediscovery)
+    const constitution = await this.storage.getConstitutionPatterns(['id', 'content']);
 
     // Build Reflector prompt (ACE paper: analyze code → discover patterns)
     const prompt = this.buildReflectorPrompt(
@@ -14,6 +14,9 @@ import { ACEStorage } from '../storage/index.js';
 import { ACEConfig } from '../config.js';
 import { Curator } from '../curator/index.js';
 
+// Domain resources per listing page (the cursor is the last domain listed)
+const DOMAIN_PAGE_SIZE = 100;
+
 export function registerResources(
   server: Server,
   storage: ACEStorage,
@@ -22,15 +25,36 @@ export function registerResources(
   const curator = new Curator(storage, config);
 
   // List available resources
-  server.setRequestHandler(ListResourcesRequestSchema, async () => {
+  server.setRequestHandler(ListResourcesRequestSchema, async (request) => {
+    const cursor = request.params?.cursor;
+
+    // Fetch one extra domain to know whether another page follows
+    const domains = await storage.listDomains(cursor || '', DOMAIN_PAGE_SIZE + 1);
+    const hasMore = domains.length > DOMAIN_PAGE_SIZE;
+    const page = domains.slice(0, DOMAIN_PAGE_SIZE);
+
+    const domainResources = page.map(domain => ({
+      uri: `ace://patterns/domain/${encodeURIComponent(domain)}`,
+      name: `Patterns: ${domain}`,
+      description: `All patterns in ${domain} domain (paged; follow next_uri)`,
+      mimeType: 'application/json',
+    }));
+    const nextCursor = hasMore ? page[page.length - 1] : undefined;
+
+    // Later pages only continue the domain list
+    if (cursor) {
+      return { resources: domainResources, nextCursor };
+    }
+
     const stats = await storage.getStats();
 
     return {
+      nextCursor,
       resources: [
         {
           uri: 'ace://patterns/all',
           name: 'All ACE Patterns',
-          description: `All ${stats.total_patterns} patterns in the database`,
+          description: `All ${stats.total_patterns} patterns in the database (paged; follow next_uri)`,
           mimeType: 'application/json',
         },
         {
@@ -51,12 +75,7 @@ export function registerResources(
           description: 'Pattern database statistics',
           mimeType: 'application/json',
         },
-        ...stats.domains.map(domain => ({
-          uri: `ace://patterns/domain/${domain}`,
-          name: `Patterns: ${domain}`,
-          description: `All patterns in ${domain} domain`,
-          mimeType: 'application/json',
-        })),
+        ...domainResources,
       ],
     };
   });
@@ -66,8 +85,12 @@ export function registerResources(
     const { uri } = request.params;
 
     try {
-      if (uri === 'ace://patterns/all') {
-        return await handleAllPatterns(storage);
+      // Pattern listings are paged: ace://patterns/all?cursor=...&limit=...
+      const [path, query = ''] = uri.split('?', 2);
+      const params = new URLSearchParams(query);
+
+      if (path === 'ace://patterns/all') {
+        return await handlePatternPage(storage, uri, path, params);
       }
 
       if (uri === 'ace://patterns/constitution') {
@@ -82,9 +105,9 @@ export function registerResources(
         return await handleStats(storage);
       }
 
-      if (uri.startsWith('ace://patterns/domain/')) {
-        const domain = uri.replace('ace://patterns/domain/', '');
-        return await handleDomainPatterns(storage, domain);
+      if (path.startsWith('ace://patterns/domain/')) {
+        const domain = decodeURIComponent(path.replace('ace://patterns/domain/', ''));
+        return await handlePatternPage(storage, uri, path, params, domain);
       }
 
       throw new Error(`Unknown resource: ${uri}`);
@@ -103,17 +126,37 @@ export function registerResources(
 }
 
 /**
- * Handle ace://patterns/all resource
+ * Handle ace://patterns/all and ace://patterns/domain/{domain} resources
+ *
+ * Returns one page of patterns plus the URI of the next page (if any).
  */
-async function handleAllPatterns(storage: ACEStorage): Promise<any> {
-  const patterns = await storage.getAllPatterns();
+async function handlePatternPage(
+  storage: ACEStorage,
+  uri: string,
+  path: string,
+  params: URLSearchParams,
+  domain?: string
+): Promise<any> {
+  const limit = params.has('limit') ? parseInt(params.get('limit')!, 10) : undefined;
+  const page = await storage.getPatternsPage({
+    domain,
+    limit: Number.isNaN(limit) ? undefined : limit,
+    cursor: params.get('cursor') || undefined,
+  });
+
+  let next_uri: string | undefined;
+  if (page.next_cursor) {
+    const next = new URLSearchParams({ cursor: page.next_cursor });
+    if (limit !== undefined && !Number.isNaN(limit)) next.set('limit', String(limit));
+    next_uri = `${path}?${next}`;
+  }
 
   return {
     contents: [
       {
-        uri: 'ace://patterns/all',
+        uri,
         mimeType: 'application/json',
-        text: JSON.stringify(patterns, null, 2),
+        text: JSON.stringify({ patterns: page.patterns, next_cursor: page.next_cursor, next_uri }, null, 2),
       },
     ],
   };
@@ -169,20 +212,3 @@ async function handleStats(storage: ACEStorage): Promise<any> {
     ],
   };
 }
-
-/**
- * Handle ace://patterns/domain/{domain} resource
- */
-async function handleDomainPatterns(storage: ACEStorage, domain: string): Promise<any> {
-  const patterns = await storage.getPatternsByDomain(domain);
-
-  return {
-    contents: [
-      {
-        uri: `ace://patterns/domain/${domain}`,
-        mimeType: 'application/json',
-        text: JSON.stringify(patterns, null, 2),
-      },
-    ],
-  };
-}
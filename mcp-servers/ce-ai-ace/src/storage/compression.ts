@@ -0,0 +1,151 @@
+/**
+ * ACE Value Compression
+ *
+ * Evidence snippets and metadata JSON above a size threshold are stored as
+ * BLOBs: one format byte followed by the compressed UTF-8 text. Values stored
+ * as TEXT (small ones, and every row written before compression) are read
+ * as-is, so existing databases keep working without a migration.
+ */
+
+import Database from 'better-sqlite3';
+import { existsSync, statSync } from 'fs';
+import { brotliCompressSync, brotliDecompressSync, constants, deflateRawSync, inflateRawSync } from 'zlib';
+import { ACEConfig } from '../config.js';
+import { CompactionReport } from '../types.js';
+
+export type CompressionFormat = 'none' | 'deflate' | 'brotli';
+
+// Format byte at the start of a compressed BLOB
+const FORMAT_DEFLATE = 0x01;
+const FORMAT_BROTLI = 0x02;
+
+// Rows read per batch while compacting
+const COMPACT_BATCH_SIZE = 1000;
+
+/**
+ * Read a stored value back as text, whatever format it was written in
+ */
+export function decodeValue(value: string | Buffer): string {
+  if (typeof value === 'string') return value;
+
+  switch (value[0]) {
+    case FORMAT_DEFLATE:
+      return inflateRawSync(value.subarray(1)).toString('utf-8');
+    case FORMAT_BROTLI:
+      return brotliDecompressSync(value.subarray(1)).toString('utf-8');
+    default:
+      throw new Error(`Unknown value format: ${value[0]}`);
+  }
+}
+
+/**
+ * Bytes a stored value occupies
+ */
+function storedSize(value: string | Buffer): number {
+  return typeof value === 'string' ? Buffer.byteLength(value) : value.length;
+}
+
+export class ValueCodec {
+  private format: CompressionFormat;
+  private minBytes: number;
+
+  constructor(config: ACEConfig) {
+    this.format = config.storage.compression;
+    this.minBytes = config.storage.compression_min_bytes;
+  }
+
+  /**
+   * Value to store for `text`: compressed BLOB, or the text itself when
+   * compression is off, the text is small or it does not compress
+   */
+  encode(text: string): string | Buffer {
+    if (this.format === 'none') return text;
+
+    const raw = Buffer.from(text, 'utf-8');
+    if (raw.length < this.minBytes) return text;
+
+    const body = this.format === 'brotli'
+      ? brotliCompressSync(raw, { params: { [constants.BROTLI_PARAM_SIZE_HINT]: raw.length } })
+      : deflateRawSync(raw);
+
+    if (body.length + 1 >= raw.length) return text;
+
+    return Buffer.concat([Buffer.from([this.format === 'brotli' ? FORMAT_BROTLI : FORMAT_DEFLATE]), body]);
+  }
+}
+
+/**
+ * Rewrite evidence and metadata with the configured compression, then VACUUM
+ *
+ * Meant to run offline (`npm run compact`): rows are rewritten in batches,
+ * one transaction each, and VACUUM returns the freed pages to the filesystem.
+ */
+export function compactValues(db: Database.Database, config: ACEConfig): CompactionReport {
+  const codec = new ValueCodec(config);
+  const path = config.storage.path;
+  const fileSize = () => (existsSync(path) ? statSync(path).size : 0) +
+    (existsSync(`${path}-wal`) ? statSync(`${path}-wal`).size : 0);
+
+  const report: CompactionReport = {
+    evidence_rows: 0,
+    metadata_rows: 0,
+    rows_rewritten: 0,
+    bytes_before: 0,
+    bytes_after: 0,
+    bytes_saved: 0,
+    file_bytes_before: fileSize(),
+    file_bytes_after: 0,
+  };
+
+  const tables = [
+    {
+      select: db.prepare('SELECT seq AS key, content AS value FROM pattern_evidence WHERE seq > ? ORDER BY seq LIMIT ?'),
+      update: db.prepare('UPDATE pattern_evidence SET content = ? WHERE seq = ?'),
+      count: 'evidence_rows' as const,
+    },
+    {
+      select: db.prepare(
+        'SELECT rowid AS key, metadata AS value FROM patterns WHERE rowid > ? AND metadata IS NOT NULL ORDER BY rowid LIMIT ?'
+      ),
+      update: db.prepare('UPDATE patterns SET metadata = ? WHERE rowid = ?'),
+      count: 'metadata_rows' as const,
+    },
+  ];
+
+  for (const { select, update, count } of tables) {
+    let after = 0;
+
+    while (true) {
+      const rows = select.all(after, COMPACT_BATCH_SIZE) as Array<{ key: number; value: string | Buffer }>;
+      if (rows.length === 0) break;
+
+      db.transaction(() => {
+        for (const { key, value } of rows) {
+          const encoded = codec.encode(decodeValue(value));
+          const before = storedSize(value);
+          const size = storedSize(encoded);
+
+          report[count]++;
+          report.bytes_before += before;
+          report.bytes_after += size;
+
+          if (typeof encoded !== typeof value || size !== before) {
+            update.run(encoded, key);
+            report.rows_rewritten++;
+          }
+        }
+      })();
+
+      after = rows[rows.length - 1].key;
+    }
+  }
+
+  report.bytes_saved = report.bytes_before - report.bytes_after;
+
+  // VACUUM goes through the WAL; checkpoint so the main file shrinks
+  db.exec('VACUUM');
+  db.pragma('wal_checkpoint(TRUNCATE)');
+  report.file_bytes_after = fileSize();
+
+  return report;
+}
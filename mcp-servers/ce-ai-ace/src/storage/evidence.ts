@@ -0,0 +1,213 @@
+/**
+ * ACE Evidence Store
+ *
+ * Pattern evidence lives in `pattern_evidence`, one row per entry, keyed by
+ * pattern id and a hash of the content. Appends are a single insert (duplicates
+ * are ignored by the unique key) and each pattern keeps at most `limit`
+ * entries, so merges cost the same however long a pattern's history is.
+ * Large entries are stored compressed (see compression.ts).
+ *
+ * Each entry also stores a diversity key, a MinHash signature of its words:
+ * two entries share a key with probability close to their word-set Jaccard
+ * similarity. The 'diverse' policy evicts by key with one indexed lookup
+ * instead of decoding and comparing every entry.
+ */
+
+import Database from 'better-sqlite3';
+import { createHash } from 'crypto';
+import { ACEConfig } from '../config.js';
+import { ValueCodec, decodeValue } from './compression.js';
+
+export type EvidencePolicy = 'newest' | 'diverse';
+
+// MinHash functions per diversity key: more means only closer entries collide
+const DIVERSITY_HASHES = 2;
+
+/**
+ * Word set of an evidence entry, for diversity comparisons
+ */
+function tokens(text: string): Set<string> {
+  return new Set(text.toLowerCase().split(/\W+/).filter(Boolean));
+}
+
+/**
+ * 32-bit FNV-1a of `text`, varied by `seed`
+ */
+function fnv1a(text: string, seed: number): number {
+  let hash = (0x811c9dc5 ^ seed) >>> 0;
+  for (let i = 0; i < text.length; i++) {
+    hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193) >>> 0;
+  }
+  return hash;
+}
+
+/**
+ * MinHash signature of an entry's words (near-duplicates share it)
+ */
+export function diversityKey(text: string): string {
+  const words = tokens(text);
+  const parts: string[] = [];
+
+  for (let seed = 0; seed < DIVERSITY_HASHES; seed++) {
+    let min = 0xffffffff;
+    for (const word of words) {
+      min = Math.min(min, fnv1a(word, seed));
+    }
+    parts.push(min.toString(16).padStart(8, '0'));
+  }
+
+  return parts.join('');
+}
+
+export class EvidenceStore {
+  private db: Database.Database;
+  private limit: number;
+  private policy: EvidencePolicy;
+  private codec: ValueCodec;
+  private insertStmt: Database.Statement;
+  private listStmt: Database.Statement;
+  private countStmt: Database.Statement;
+  private trimOldestStmt: Database.Statement;
+  private nearDuplicateStmt: Database.Statement;
+  private evictStmt: Database.Statement;
+  private removeStmt: Database.Statement;
+
+  constructor(db: Database.Database, config: ACEConfig) {
+    this.db = db;
+    this.limit = Math.max(1, config.ace.evidence_limit);
+    this.policy = config.ace.evidence_policy === 'diverse' ? 'diverse' : 'newest';
+    this.codec = new ValueCodec(config);
+
+    this.insertStmt = db.prepare(`
+      INSERT INTO pattern_evidence (pattern_id, hash, diversity_key, content, added_at)
+      VALUES (?, ?, ?, ?, ?)
+      ON CONFLICT(pattern_id, hash) DO NOTHING
+    `);
+    this.listStmt = db.prepare('SELECT content FROM pattern_evidence WHERE pattern_id = ? ORDER BY seq').pluck();
+    this.countStmt = db.prepare('SELECT COUNT(*) FROM pattern_evidence WHERE pattern_id = ?').pluck();
+    // Everything older than the `limit` newest entries (no-op while under the limit)
+    this.trimOldestStmt = db.prepare(`
+      DELETE FROM pattern_evidence
+      WHERE pattern_id = ? AND seq <= (
+        SELECT seq FROM pattern_evidence WHERE pattern_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+      )
+    `);
+    // Newest entry with an older near-duplicate (idx_evidence_diversity)
+    this.nearDuplicateStmt = db.prepare(`
+      SELECT MAX(seq) FROM pattern_evidence AS e
+      WHERE pattern_id = ? AND EXISTS (
+        SELECT 1 FROM pattern_evidence AS d
+        WHERE d.pattern_id = e.pattern_id AND d.diversity_key = e.diversity_key AND d.seq < e.seq
+      )
+    `).pluck();
+    this.evictStmt = db.prepare('DELETE FROM pattern_evidence WHERE seq = ?');
+    this.removeStmt = db.prepare('DELETE FROM pattern_evidence WHERE pattern_id = ?');
+  }
+
+  /**
+   * Add an entry unless the pattern already has it, then enforce the limit
+   *
+   * Returns whether a new entry was stored.
+   */
+  append(patternId: string, content: string, addedAt: string = new Date().toISOString()): boolean {
+    const hash = createHash('sha256').update(content).digest('hex');
+    const inserted = this.insertStmt.run(patternId, hash, diversityKey(content), this.codec.encode(content), addedAt);
+    if (inserted.changes === 0) {
+      return false;
+    }
+
+    if (this.policy === 'newest') {
+      this.trimOldestStmt.run(patternId, patternId, this.limit);
+    } else {
+      this.trimForDiversity(patternId);
+    }
+    return true;
+  }
+
+  /**
+   * Replace a pattern's evidence with the given entries (limit still applies)
+   */
+  replace(patternId: string, contents: string[], addedAt?: string): void {
+    this.removeStmt.run(patternId);
+    for (const content of contents) {
+      this.append(patternId, content, addedAt);
+    }
+  }
+
+  remove(patternId: string): void {
+    this.removeStmt.run(patternId);
+  }
+
+  /**
+   * A pattern's evidence, oldest first
+   */
+  list(patternId: string): string[] {
+    return (this.listStmt.all(patternId) as Array<string | Buffer>).map(decodeValue);
+  }
+
+  /**
+   * Move evidence still stored in the legacy `patterns.evidence` JSON column
+   */
+  importLegacy(): void {
+    const rows = this.db.prepare(
+      "SELECT id, evidence, updated_at FROM patterns WHERE evidence != '[]'"
+    ).all() as any[];
+
+    if (rows.length === 0) return;
+
+    const clearStmt = this.db.prepare("UPDATE patterns SET evidence = '[]' WHERE id = ?");
+
+    this.db.transaction(() => {
+      for (const row of rows) {
+        for (const content of JSON.parse(row.evidence) as string[]) {
+          this.append(row.id, content, row.updated_at);
+        }
+        clearStmt.run(row.id);
+      }
+    })();
+
+    console.error(`✅ Moved evidence of ${rows.length} patterns to pattern_evidence`);
+  }
+
+  /**
+   * Compute diversity keys of entries stored before keys existed
+   */
+  backfillKeys(): void {
+    const rows = this.db.prepare(
+      'SELECT seq, content FROM pattern_evidence WHERE diversity_key IS NULL'
+    ).all() as Array<{ seq: number; content: string | Buffer }>;
+
+    if (rows.length === 0) return;
+
+    const updateStmt = this.db.prepare('UPDATE pattern_evidence SET diversity_key = ? WHERE seq = ?');
+
+    this.db.transaction(() => {
+      for (const { seq, content } of rows) {
+        updateStmt.run(diversityKey(decodeValue(content)), seq);
+      }
+    })();
+
+    console.error(`✅ Indexed diversity keys of ${rows.length} evidence entries`);
+  }
+
+  /**
+   * Over the limit: drop the newer entry of a near-duplicate pair
+   *
+   * Keeps the set of examples as varied as possible instead of letting
+   * near-identical snippets crowd out older, different ones. With no
+   * near-duplicates left, the oldest entries go.
+   */
+  private trimForDiversity(patternId: string): void {
+    let excess = (this.countStmt.get(patternId) as number) - this.limit;
+
+    for (; excess > 0; excess--) {
+      const seq = this.nearDuplicateStmt.get(patternId) as number | null;
+      if (seq === null) break;
+      this.evictStmt.run(seq);
+    }
+
+    if (excess > 0) {
+      this.trimOldestStmt.run(patternId, patternId, this.limit);
+    }
+  }
+}
@@ -7,19 +7,236 @@
 import Database from 'better-sqlite3';
 import { existsSync, mkdirSync } from 'fs';
 import { dirname } from 'path';
-import { Pattern, StorageBackend } from '../types.js';
+import { EmbeddingsReadiness, MigrationProgress, Pattern, PatternBatch, PatternField, PatternPage, PatternPageOptions, StorageBackend } from '../types.js';
 import { ACEConfig } from '../config.js';
 import { EmbeddingsEngine } from '../embeddings/index.js';
+import { PcaProjection } from '../embeddings/pca.js';
+import { BatcherStats } from '../embeddings/batcher.js';
+import { QueryCacheStats } from '../embeddings/query-cache.js';
+import { EmbeddingMigration } from './migration.js';
+import { EvidenceStore } from './evidence.js';
+import { ValueCodec, decodeValue } from './compression.js';
+import { WriteQueue, WriteQueueStats } from './write-queue.js';
+
+// Max ids bound per `IN (...)` query (SQLite's default variable limit is 999)
+const SQLITE_MAX_PARAMS = 500;
+
+// Dynamic statements (updatePattern column sets, IN-list sizes) kept prepared
+const STATEMENT_CACHE_SIZE = 64;
+
+// Pattern page sizes (getPatternsPage)
+const DEFAULT_PAGE_SIZE = 100;
+const MAX_PAGE_SIZE = 500;
+
+// Stored vectors sampled to fit a PCA projection (needs >= 4x the target dims)
+const PCA_FIT_SAMPLE = 5000;
+const PCA_MIN_SAMPLES_PER_DIM = 4;
+
+// Stored vectors read per chunk when sampling for and switching to a projection
+const PROJECTION_LOAD_CHUNK = 1000;
+
+/**
+ * View a normalized embedding as a Float32 BLOB (no copy)
+ */
+function encodeEmbedding(embedding: Float32Array): Buffer {
+  return Buffer.from(embedding.buffer, embedding.byteOffset, embedding.byteLength);
+}
+
+/**
+ * View a Float32 BLOB as an embedding
+ *
+ * Copies only when the buffer is not 4-byte aligned.
+ */
+function decodeEmbedding(blob: Buffer): Float32Array {
+  if (blob.byteOffset % Float32Array.BYTES_PER_ELEMENT === 0) {
+    return new Float32Array(blob.buffer, blob.byteOffset, blob.byteLength / Float32Array.BYTES_PER_ELEMENT);
+  }
+  return new Float32Array(new Uint8Array(blob).buffer);
+}
+
+// Pattern fields in output order; evidence lives in pattern_evidence and the
+// embedding BLOB is never read back with a pattern
+const PATTERN_FIELDS: PatternField[] = [
+  'id', 'name', 'domain', 'content', 'confidence', 'observations', 'harmful',
+  'evidence', 'created_at', 'updated_at', 'metadata',
+];
+const PATTERN_COLUMNS = PATTERN_FIELDS.filter(field => field !== 'evidence');
+
+/**
+ * Column list for a projection; the sort key is always read (page cursors)
+ */
+function patternColumns(fields?: readonly PatternField[]): string {
+  if (!fields) return PATTERN_COLUMNS.join(', ');
+
+  const wanted = new Set<string>(['id', 'confidence', 'observations', ...fields]);
+  return PATTERN_COLUMNS.filter(column => wanted.has(column)).join(', ');
+}
+
+// Decoder behind each lazy getter not read yet (decoders return fresh values)
+const lazyDecoders = new WeakMap<Function, () => unknown>();
+
+/**
+ * Define `key` as decoded on first read, then stored as a plain property
+ */
+function defineLazy<T extends object, K extends keyof T>(target: T, key: K, decode: () => T[K]): void {
+  const settle = (value: T[K]) => {
+    Object.defineProperty(target, key, { value, writable: true, enumerable: true, configurable: true });
+  };
+  const get = () => {
+    const value = decode();
+    settle(value);
+    return value;
+  };
+  lazyDecoders.set(get, decode);
+
+  Object.defineProperty(target, key, { enumerable: true, configurable: true, get, set: settle });
+}
+
+/**
+ * Run `decode` on the first call only; every call returns a copy of its result
+ *
+ * Clones of a cached pattern share its decoder, so without this each clone
+ * would query and decode the value again.
+ */
+function decodeOnce<T>(decode: () => T, duplicate: (value: T) => T): () => T {
+  let decoded: { value: T } | null = null;
+  return () => {
+    if (!decoded) decoded = { value: decode() };
+    return duplicate(decoded.value);
+  };
+}
+
+/**
+ * Lazily copy `source[key]` onto `target` without reading it now
+ *
+ * A still-undecoded source shares its decoder; a settled one is duplicated
+ * on first read. Neither keeps `source` itself alive.
+ */
+function copyLazy<K extends 'evidence' | 'metadata'>(
+  target: Pattern,
+  source: Pattern,
+  key: K,
+  duplicate: (value: Pattern[K]) => Pattern[K]
+): void {
+  const getter = Object.getOwnPropertyDescriptor(source, key)?.get;
+  const decode = getter && lazyDecoders.get(getter);
+
+  if (decode) {
+    defineLazy(target, key, decode as () => Pattern[K]);
+  } else {
+    const value = source[key];
+    defineLazy(target, key, () => duplicate(value));
+  }
+}
+
+/**
+ * Copy a pattern so callers and the pattern cache never share arrays
+ *
+ * Evidence and metadata are copied on first access, so an undecoded source
+ * stays lazy.
+ */
+function clonePattern(pattern: Pattern): Pattern {
+  const copy = {
+    id: pattern.id,
+    name: pattern.name,
+    domain: pattern.domain,
+    content: pattern.content,
+    confidence: pattern.confidence,
+    observations: pattern.observations,
+    harmful: pattern.harmful,
+    created_at: pattern.created_at,
+    updated_at: pattern.updated_at,
+  } as Pattern;
+  copyLazy(copy, pattern, 'evidence', evidence => [...evidence]);
+  copyLazy(copy, pattern, 'metadata', metadata => ({ ...metadata }));
+  return copy;
+}
+
+/**
+ * A new pattern with the defaults it is stored with
+ */
+function toStoredPattern(pattern: Pattern, now: string): Pattern {
+  return {
+    ...pattern,
+    observations: pattern.observations || 1,
+    harmful: pattern.harmful || 0,
+    evidence: pattern.evidence || [],
+    created_at: pattern.created_at || now,
+    updated_at: pattern.updated_at || now,
+    metadata: pattern.metadata || {},
+  };
+}
+
+/**
+ * getAllPatterns order: confidence, then observations, descending
+ */
+function byConfidence(a: Pattern, b: Pattern): number {
+  return b.confidence - a.confidence || b.observations - a.observations;
+}
+
+/**
+ * Opaque page cursor: the sort key of the last pattern on a page
+ */
+function encodeCursor(pattern: { confidence: number; observations: number; id: string }): string {
+  return Buffer.from(JSON.stringify([pattern.confidence, pattern.observations, pattern.id])).toString('base64url');
+}
+
+function decodeCursor(cursor: string): [number, number, string] {
+  try {
+    const key = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf-8'));
+    if (Array.isArray(key) && typeof key[0] === 'number' && typeof key[1] === 'number' && typeof key[2] === 'string') {
+      return key as [number, number, string];
+    }
+  } catch {
+    // Fall through
+  }
+  throw new Error(`Invalid cursor: ${cursor}`);
+}
+
+/**
+ * Fixed statements, prepared once after the schema is created
+ */
+interface Statements {
+  insertPattern: Database.Statement;
+  getPatternVector: Database.Statement;
+  getAllPatterns: Database.Statement;
+  deletePattern: Database.Statement;
+  touchPattern: Database.Statement;
+  saveEmbedding: Database.Statement;
+  domainStats: Database.Statement;
+  domainPage: Database.Statement;
+  dataVersion: Database.Statement;
+}
 
 export class ACEStorage implements StorageBackend {
   private db!: Database.Database;
+  private stmts!: Statements;
+  private evidence!: EvidenceStore;
+  private codec: ValueCodec;
+  private writes!: WriteQueue;
+  private statementCache = new Map<string, Database.Statement>();
+  private patternCache: Map<string, Pattern> | null = null; // Write-through copy of patterns
+  private sortedPatterns: Pattern[] | null = null;
+  private cacheVersion = 0;
   private embeddings!: EmbeddingsEngine;
+  private embeddingsReady!: Promise<void>;
+  private readiness!: EmbeddingsReadiness;
+  private migration: EmbeddingMigration | null = null;
+  private projectionFit: Promise<void> | null = null;
+  private embeddingLeases = 0;
   private config: ACEConfig;
 
   constructor(config: ACEConfig) {
     this.config = config;
+    this.codec = new ValueCodec(config);
   }
 
+  /**
+   * Open the database; the embedding model loads in the background
+   *
+   * Returns as soon as SQLite is ready so pattern reads and stats can be
+   * served immediately. Embedding-dependent calls wait for `whenReady()`.
+   */
   async initialize(): Promise<void> {
     // Ensure directory exists
     const dbDir = dirname(this.config.storage.path);
@@ -30,17 +247,435 @@ export class ACEStorage implements StorageBackend {
     // Initialize SQLite
     this.db = new Database(this.config.storage.path);
     this.db.pragma('journal_mode = WAL');
+    // A group that fails to commit may already be in the pattern cache
+    this.writes = new WriteQueue(this.db, this.config.storage.write_window_ms, () => {
+      this.patternCache = null;
+    });
 
     // Create schema
     this.createSchema();
+    this.stmts = this.prepareStatements();
+    this.evidence = new EvidenceStore(this.db, this.config);
+    this.evidence.backfillKeys();
+    this.evidence.importLegacy();
 
-    // Initialize embeddings engine
-    this.embeddings = new EmbeddingsEngine(this.config);
-    await this.embeddings.initialize();
+    // Initialize embeddings engine (model loads in the background).
+    // Keep serving the model the stored vectors were built with; a changed
+    // model is migrated to in the background once the old one is ready.
+    this.embeddings = new EmbeddingsEngine(this.config, this.getActiveModel());
+    this.readiness = {
+      state: 'loading',
+      model: this.embeddings.modelId,
+      started_at: new Date().toISOString(),
+    };
+    this.embeddingsReady = this.initializeEmbeddings();
+    this.embeddingsReady.catch(error => {
+      this.readiness.state = 'failed';
+      this.readiness.error = (error as Error).message;
+      console.error('❌ Embeddings engine failed to load:', error);
+    });
 
     console.error('✅ Storage initialized');
   }
 
+  /**
+   * Load the embedding model and rebuild the vector store
+   */
+  private async initializeEmbeddings(): Promise<void> {
+    const targetModel = this.config.embeddings.model;
+
+    try {
+      await this.embeddings.initialize();
+    } catch (error) {
+      if (this.embeddings.modelId === targetModel) throw error;
+
+      // Old model unavailable: re-embed everything with the new one up front
+      console.error(`⚠️  Cannot load ${this.embeddings.modelId}, re-embedding with ${targetModel}:`, error);
+      void this.embeddings.dispose();
+      this.embeddings = new EmbeddingsEngine(this.config);
+      this.readiness.model = targetModel;
+      await this.embeddings.initialize();
+    }
+
+    // Optional PCA projection saved for this model (fitted below if missing)
+    const projection = this.loadProjection();
+    if (projection) {
+      this.embeddings.setProjection(projection);
+    }
+
+    // Quantized/projected indexes rescore candidates against the persisted vectors
+    this.embeddings.setExactVectorSource(ids => this.loadExactEmbeddings(ids));
+
+    // One vector partition per domain (restores persisted HNSW graphs)
+    const domains = this.db.prepare('SELECT domain FROM domain_stats').pluck().all() as string[];
+    await this.embeddings.openPartitions(domains);
+
+    // Rebuild vector cache from persisted embeddings
+    await this.loadEmbeddings();
+
+    this.readiness.state = 'ready';
+    this.readiness.ready_at = new Date().toISOString();
+
+    // No projection saved yet: serve full vectors while one is fitted
+    if (!projection && this.config.embeddings.pca_dims > 0) {
+      this.projectionFit = this.fitProjection();
+    }
+
+    if (this.embeddings.modelId !== targetModel) {
+      this.startMigration();
+    }
+  }
+
+  /**
+   * Load the persisted PCA projection for the serving model
+   *
+   * Returns null when PCA is off or no projection has been fitted yet.
+   */
+  private loadProjection(): PcaProjection | null {
+    const dims = this.config.embeddings.pca_dims;
+    if (dims <= 0 || this.config.embeddings.index === 'hnsw') return null;
+
+    const saved = this.db.prepare(
+      'SELECT input_dims, matrix FROM vector_projections WHERE model = ? AND dims = ?'
+    ).get(this.embeddings.modelId, dims) as any;
+
+    return saved ? PcaProjection.deserialize(saved.matrix, saved.input_dims, dims) : null;
+  }
+
+  /**
+   * Fit, persist and switch to a PCA projection in the background
+   *
+   * Sampling, the fit and the rebuild of the projected partitions yield to
+   * the event loop between chunks; until they finish, searches use the full
+   * vectors.
+   * Skipped while there are too few stored vectors to fit.
+   */
+  private async fitProjection(): Promise<void> {
+    const dims = this.config.embeddings.pca_dims;
+    if (dims <= 0 || this.config.embeddings.index === 'hnsw') return;
+
+    const engine = this.embeddings;
+    const model = engine.modelId;
+
+    // Uniform sample (reservoir) read in the same yielding chunks as the
+    // rebuild, so no single query reads and sorts every BLOB
+    const sample: Float32Array[] = [];
+    let seen = 0;
+    await this.forEachStoredEmbedding(model, (_id, embedding) => {
+      seen++;
+      if (sample.length < PCA_FIT_SAMPLE) {
+        sample.push(embedding);
+      } else {
+        const slot = Math.floor(Math.random() * seen);
+        if (slot < PCA_FIT_SAMPLE) sample[slot] = embedding;
+      }
+    });
+
+    if (sample.length < dims * PCA_MIN_SAMPLES_PER_DIM || sample[0].length <= dims) {
+      console.error(`⚠️  PCA projection skipped: ${sample.length} stored vectors, need ${dims * PCA_MIN_SAMPLES_PER_DIM}`);
+      return;
+    }
+
+    console.error(`🔄 Fitting ${sample[0].length} → ${dims} PCA projection on ${sample.length} vectors in the background...`);
+
+    try {
+      const projection = await PcaProjection.fitAsync(sample, dims);
+
+      // A migration may have switched models while fitting
+      if (this.embeddings !== engine) return;
+
+      const saveStmt = this.db.prepare(`
+        INSERT OR REPLACE INTO vector_projections (model, dims, input_dims, matrix, fitted_on, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+      `);
+      await this.writes.write(() =>
+        saveStmt.run(model, dims, projection.inputDim, projection.serialize(), sample.length, new Date().toISOString())
+      );
+
+      await engine.applyProjection(projection, add => this.forEachStoredEmbedding(model, add));
+      console.error(`✅ PCA projection active (${projection.inputDim} → ${dims})`);
+    } catch (error) {
+      console.error('⚠️  PCA projection failed, keeping full vectors:', error);
+    }
+  }
+
+  /**
+   * Pass every stored vector of `model` to `fn`, yielding between chunks
+   */
+  private async forEachStoredEmbedding(
+    model: string,
+    fn: (id: string, embedding: Float32Array, domain: string) => void
+  ): Promise<void> {
+    const stmt = this.db.prepare(`
+      SELECT id, domain, embedding FROM patterns
+      WHERE embedding IS NOT NULL AND embedding_model = ? AND id > ?
+      ORDER BY id
+      LIMIT ?
+    `);
+
+    let after = '';
+    while (true) {
+      const rows = stmt.all(model, after, PROJECTION_LOAD_CHUNK) as any[];
+      if (rows.length === 0) return;
+
+      for (const row of rows) {
+        fn(row.id, decodeEmbedding(row.embedding), row.domain);
+      }
+      after = rows[rows.length - 1].id;
+
+      await new Promise(resolve => setImmediate(resolve));
+    }
+  }
+
+  /**
+   * Model that produced most stored vectors (the configured one if none)
+   */
+  private getActiveModel(): string {
+    const row = this.db.prepare(`
+      SELECT embedding_model FROM patterns
+      WHERE embedding IS NOT NULL AND embedding_model IS NOT NULL
+      GROUP BY embedding_model
+      ORDER BY COUNT(*) DESC
+      LIMIT 1
+    `).get() as any;
+
+    return row ? row.embedding_model : this.config.embeddings.model;
+  }
+
+  /**
+   * Re-embed all patterns with the configured model in the background
+   */
+  private startMigration(): void {
+    const target = new EmbeddingsEngine(this.config);
+
+    this.migration = new EmbeddingMigration(this.db, target, this.embeddings.modelId, this.config, {
+      isBusy: () => this.embeddings.isBusy() || this.embeddingLeases > 0,
+      onSwitch: (engine) => {
+        const previous = this.embeddings;
+        engine.setExactVectorSource(ids => this.loadExactEmbeddings(ids));
+        this.embeddings = engine;
+        this.readiness.model = engine.modelId;
+        // Staged vectors cover every pattern as of the switch
+        const latest = this.db.prepare('SELECT MAX(updated_at) FROM patterns').pluck().get() as string | null;
+        engine.markSynced(latest ?? '');
+        // The retired model's partitions, persisted HNSW graphs included, are never read again
+        void previous.clear();
+        void previous.dispose();
+      },
+      write: fn => this.writes.write(fn),
+      encode: encodeEmbedding,
+      decode: decodeEmbedding,
+    });
+
+    void this.migration.run();
+  }
+
+  /**
+   * Progress of the background embedding migration (null if none ran)
+   */
+  getMigrationProgress(): MigrationProgress | null {
+    return this.migration ? this.migration.getProgress() : null;
+  }
+
+  /**
+   * Run work that holds embeddings across awaits (e.g. a curate batch)
+   *
+   * The embedding migration never switches models while a lease is held,
+   * so precomputed vectors always match the index they are compared with.
+   */
+  async withEmbeddingLease<T>(fn: () => Promise<T>): Promise<T> {
+    this.embeddingLeases++;
+    try {
+      return await fn();
+    } finally {
+      this.embeddingLeases--;
+    }
+  }
+
+  /**
+   * Run a read-then-write sequence (e.g. a curate batch) with no other
+   * write made in between
+   *
+   * Writes inside it apply at once and are group-committed with those of
+   * the sections that follow; the returned promise settles once they are
+   * committed.
+   */
+  exclusive<T>(fn: () => Promise<T>): Promise<T> {
+    return this.writes.exclusive(fn);
+  }
+
+  /**
+   * Resolves once the embedding model and vectors are loaded
+   */
+  whenReady(): Promise<void> {
+    return this.embeddingsReady;
+  }
+
+  /**
+   * Commit queued writes, stop embedding work and close the database
+   *
+   * Waits for the model to finish loading (or fail) and for a projection
+   * fit in progress, so no background work touches the closed database. An
+   * interrupted embedding migration resumes on the next start.
+   */
+  async close(): Promise<void> {
+    await this.embeddingsReady.catch(() => {});
+    await this.projectionFit?.catch(() => {});
+    await this.migration?.stop();
+    await this.writes.drain();
+    await this.embeddings.dispose();
+    this.db.close();
+  }
+
+  /**
+   * Embedding model loading state
+   */
+  getReadiness(): EmbeddingsReadiness {
+    return { ...this.readiness };
+  }
+
+  /**
+   * Load persisted embeddings into the vector store
+   *
+   * Rows with a missing vector, or one produced by a different model,
+   * are re-embedded and written back.
+   */
+  private async loadEmbeddings(): Promise<void> {
+    const stmt = this.db.prepare(
+      'SELECT id, domain, content, embedding, embedding_model, updated_at FROM patterns'
+    );
+
+    const modelId = this.embeddings.modelId;
+    const ids = new Set<string>();
+    const stale: Array<{ id: string; domain: string; content: string }> = [];
+    let syncedThrough = '';
+
+    // Stream rows; each BLOB is viewed in place and copied once into the index
+    for (const row of stmt.iterate() as IterableIterator<any>) {
+      ids.add(row.id);
+      if (row.updated_at > syncedThrough) syncedThrough = row.updated_at;
+
+      if (row.embedding && row.embedding_model === modelId) {
+        // Persisted indexes (HNSW) already hold most vectors; rows updated
+        // after the graph was saved may have changed since
+        if (!this.embeddings.hasCurrentEmbedding(row.id, row.domain, row.updated_at)) {
+          this.embeddings.loadEmbedding(row.id, decodeEmbedding(row.embedding), row.domain);
+        }
+      } else {
+        stale.push({ id: row.id, domain: row.domain, content: row.content });
+      }
+    }
+
+    // Drop vectors a persisted index holds for since-deleted patterns
+    this.embeddings.retainEmbeddings(ids);
+
+    if (stale.length > 0) {
+      console.error(`🔄 Re-embedding ${stale.length} patterns with missing or stale vectors...`);
+
+      const embeddings = await this.embeddings.embedBatch(stale.map(row => row.content));
+      stale.forEach(({ id, domain }, i) => this.embeddings.loadEmbedding(id, embeddings[i], domain));
+
+      // Exclusive sections never wait for readiness, so this cannot queue
+      // behind one that waits for this startup to finish
+      await this.writes.write(() => {
+        stale.forEach(({ id }, i) => this.saveEmbedding(id, embeddings[i]));
+      });
+    }
+
+    this.embeddings.markSynced(syncedThrough);
+    console.error(`✅ Loaded ${ids.size - stale.length} embeddings from disk`);
+  }
+
+  /**
+   * Read full-precision embeddings for the given patterns
+   */
+  private loadExactEmbeddings(ids: string[]): Map<string, Float32Array> {
+    const embeddings = new Map<string, Float32Array>();
+
+    const rows = this.selectByIds(
+      list => `SELECT id, embedding FROM patterns WHERE embedding_model = ? AND id IN (${list})`,
+      ids,
+      this.embeddings.modelId
+    );
+
+    for (const row of rows) {
+      if (row.embedding) {
+        embeddings.set(row.id, decodeEmbedding(row.embedding));
+      }
+    }
+
+    return embeddings;
+  }
+
+  /**
+   * Run an `id IN (...)` query over many ids, chunked to SQLite's parameter limit
+   *
+   * Chunks are padded to a power-of-two size (repeating the last id) so only
+   * a handful of distinct statements are ever prepared. Row order is
+   * unspecified; `params` are bound before the ids.
+   */
+  private selectByIds(sql: (list: string) => string, ids: string[], ...params: unknown[]): any[] {
+    const rows: any[] = [];
+
+    for (let start = 0; start < ids.length; start += SQLITE_MAX_PARAMS) {
+      const chunk = ids.slice(start, start + SQLITE_MAX_PARAMS);
+
+      let size = 1;
+      while (size < chunk.length) size *= 2;
+      size = Math.min(size, SQLITE_MAX_PARAMS);
+      while (chunk.length < size) chunk.push(chunk[chunk.length - 1]);
+
+      const stmt = this.prepareCached(sql(new Array(size).fill('?').join(', ')));
+      rows.push(...(stmt.all(...params, ...chunk) as any[]));
+    }
+
+    return rows;
+  }
+
+  /**
+   * Persist a pattern's embedding alongside its row
+   */
+  private saveEmbedding(id: string, embedding: Float32Array): void {
+    this.stmts.saveEmbedding.run(encodeEmbedding(embedding), this.embeddings.modelId, id);
+  }
+
+  private prepareStatements(): Statements {
+    return {
+      insertPattern: this.db.prepare(`
+        INSERT INTO patterns (id, name, domain, content, confidence, observations, harmful, evidence, created_at, updated_at, metadata, embedding, embedding_model)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      `),
+      getPatternVector: this.db.prepare('SELECT id, domain, content, embedding, embedding_model FROM patterns WHERE id = ?'),
+      getAllPatterns: this.db.prepare(`SELECT ${patternColumns()} FROM patterns ORDER BY confidence DESC, observations DESC`),
+      deletePattern: this.db.prepare('DELETE FROM patterns WHERE id = ?'),
+      touchPattern: this.db.prepare('UPDATE patterns SET updated_at = ? WHERE id = ?'),
+      saveEmbedding: this.db.prepare('UPDATE patterns SET embedding = ?, embedding_model = ? WHERE id = ?'),
+      domainStats: this.db.prepare('SELECT domain, total, high, medium FROM domain_stats ORDER BY domain'),
+      domainPage: this.db.prepare('SELECT domain FROM domain_stats WHERE domain > ? ORDER BY domain LIMIT ?').pluck(),
+      dataVersion: this.db.prepare('PRAGMA data_version').pluck(),
+    };
+  }
+
+  /**
+   * Prepare dynamic SQL once per distinct statement (bounded, LRU)
+   */
+  private prepareCached(sql: string): Database.Statement {
+    let stmt = this.statementCache.get(sql);
+
+    if (stmt) {
+      // Move to most-recently-used position
+      this.statementCache.delete(sql);
+    } else {
+      stmt = this.db.prepare(sql);
+      if (this.statementCache.size >= STATEMENT_CACHE_SIZE) {
+        this.statementCache.delete(this.statementCache.keys().next().value!);
+      }
+    }
+
+    this.statementCache.set(sql, stmt);
+    return stmt;
+  }
+
   private createSchema(): void {
     this.db.exec(`
       CREATE TABLE IF NOT EXISTS patterns (
@@ -51,15 +686,19 @@ export class ACEStorage implements StorageBackend {
         confidence REAL NOT NULL,
         observations INTEGER NOT NULL DEFAULT 1,
         harmful INTEGER NOT NULL DEFAULT 0,
-        evidence TEXT NOT NULL, -- JSON array
+        evidence TEXT NOT NULL, -- Legacy JSON array (now in pattern_evidence)
         created_at TEXT NOT NULL,
         updated_at TEXT NOT NULL,
-        metadata TEXT -- JSON object
+        metadata TEXT, -- JSON object (compressed BLOB when large)
+        embedding BLOB, -- Normalized Float32 vector
+        embedding_model TEXT -- Model that produced the embedding
       );
 
-      CREATE INDEX IF NOT EXISTS idx_patterns_domain ON patterns(domain);
-      CREATE INDEX IF NOT EXISTS idx_patterns_confidence ON patterns(confidence DESC);
+      DROP INDEX IF EXISTS idx_patterns_domain; -- Superseded by idx_patterns_domain_confidence
+      CREATE INDEX IF NOT EXISTS idx_patterns_domain_confidence ON patterns(domain, confidence DESC, observations DESC, id);
+      DROP INDEX IF EXISTS idx_patterns_confidence; -- Prefix of idx_patterns_page
       CREATE INDEX IF NOT EXISTS idx_patterns_observations ON patterns(observations DESC);
+      CREATE INDEX IF NOT EXISTS idx_patterns_page ON patterns(confidence DESC, observations DESC, id);
 
       CREATE TABLE IF NOT EXISTS insights (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -82,105 +721,684 @@ export class ACEStorage implements StorageBackend {
         files_processed INTEGER NOT NULL,
         timestamp TEXT NOT NULL
       );
+
+      -- New-model vectors staged by a background embedding migration
+      CREATE TABLE IF NOT EXISTS embedding_migration (
+        pattern_id TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        embedding BLOB NOT NULL
+      );
+
+      -- PCA projections fitted on stored vectors (ACE_PCA_DIMS)
+      CREATE TABLE IF NOT EXISTS vector_projections (
+        model TEXT NOT NULL,
+        dims INTEGER NOT NULL,
+        input_dims INTEGER NOT NULL,
+        matrix BLOB NOT NULL, -- Float32 [dims, input_dims] components
+        fitted_on INTEGER NOT NULL, -- Number of vectors sampled
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (model, dims)
+      );
+
+      -- Evidence entries, deduplicated by content hash and capped per pattern
+      CREATE TABLE IF NOT EXISTS pattern_evidence (
+        seq INTEGER PRIMARY KEY, -- Insertion order
+        pattern_id TEXT NOT NULL,
+        hash TEXT NOT NULL, -- sha256 of content
+        diversity_key TEXT, -- MinHash of content words (see evidence.ts)
+        content TEXT NOT NULL, -- Compressed BLOB when large
+        added_at TEXT NOT NULL,
+        UNIQUE (pattern_id, hash)
+      );
+
+      CREATE INDEX IF NOT EXISTS idx_evidence_pattern ON pattern_evidence(pattern_id, seq);
+
+      -- Pattern counts per domain and confidence tier (kept by triggers)
+      CREATE TABLE IF NOT EXISTS domain_stats (
+        domain TEXT PRIMARY KEY,
+        total INTEGER NOT NULL,
+        high INTEGER NOT NULL,
+        medium INTEGER NOT NULL
+      );
     `);
+
+    this.migrateSchema();
+    this.installStatsTriggers();
+    this.installConstitutionIndex();
   }
 
-  async addPattern(pattern: Pattern): Promise<void> {
-    const stmt = this.db.prepare(`
-      INSERT INTO patterns (id, name, domain, content, confidence, observations, harmful, evidence, created_at, updated_at, metadata)
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    `);
+  /**
+   * Confidence at or above which a pattern is part of the constitution
+   */
+  private constitutionThreshold(): number {
+    return Number(this.config.ace.confidence_threshold_high);
+  }
 
-    stmt.run(
-      pattern.id,
-      pattern.name,
-      pattern.domain,
-      pattern.content,
-      pattern.confidence,
-      pattern.observations || 1,
-      pattern.harmful || 0,
-      JSON.stringify(pattern.evidence || []),
-      pattern.created_at || new Date().toISOString(),
-      pattern.updated_at || new Date().toISOString(),
-      JSON.stringify(pattern.metadata || {})
+  /**
+   * Partial index over constitution-tier patterns
+   *
+   * The threshold is part of the index definition, so the index is
+   * recreated whenever ACE_CONFIDENCE_HIGH changes.
+   */
+  private installConstitutionIndex(): void {
+    const sql = 'CREATE INDEX idx_patterns_constitution ON patterns(confidence DESC, observations DESC) ' +
+      `WHERE confidence >= ${this.constitutionThreshold()}`;
+
+    const installed = this.db.prepare(
+      "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_patterns_constitution'"
+    ).pluck().get();
+
+    if (installed === sql) return;
+
+    this.db.exec('DROP INDEX IF EXISTS idx_patterns_constitution');
+    this.db.exec(sql);
+  }
+
+  /**
+   * Keep domain_stats current with triggers on patterns
+   *
+   * Tier thresholds are baked into the trigger SQL. When they differ from
+   * the installed triggers (or none exist yet), the triggers are replaced
+   * and the aggregate is rebuilt from patterns in one transaction.
+   */
+  private installStatsTriggers(): void {
+    const high = Number(this.config.ace.confidence_threshold_high);
+    const medium = Number(this.config.ace.confidence_threshold_medium);
+    const isHigh = (row: string) => `(${row}.confidence >= ${high})`;
+    const isMedium = (row: string) => `(${row}.confidence >= ${medium} AND ${row}.confidence < ${high})`;
+
+    const addNew = `
+        INSERT INTO domain_stats (domain, total, high, medium)
+        VALUES (NEW.domain, 1, ${isHigh('NEW')}, ${isMedium('NEW')})
+        ON CONFLICT(domain) DO UPDATE SET
+          total = total + 1,
+          high = high + excluded.high,
+          medium = medium + excluded.medium;`;
+
+    const removeOld = `
+        UPDATE domain_stats SET
+          total = total - 1,
+          high = high - ${isHigh('OLD')},
+          medium = medium - ${isMedium('OLD')}
+        WHERE domain = OLD.domain;
+        DELETE FROM domain_stats WHERE domain = OLD.domain AND total <= 0;`;
+
+    const triggers: Record<string, string> = {
+      patterns_stats_insert: `CREATE TRIGGER patterns_stats_insert AFTER INSERT ON patterns BEGIN${addNew}
+      END`,
+      patterns_stats_delete: `CREATE TRIGGER patterns_stats_delete AFTER DELETE ON patterns BEGIN${removeOld}
+      END`,
+      patterns_stats_update: `CREATE TRIGGER patterns_stats_update AFTER UPDATE OF domain, confidence ON patterns BEGIN${removeOld}${addNew}
+      END`,
+    };
+
+    const installed = new Map(
+      (this.db.prepare(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'patterns'"
+      ).all() as any[]).map(row => [row.name, row.sql])
     );
 
-    // Add to vector store
-    await this.embeddings.addPattern(pattern);
+    if (Object.entries(triggers).every(([name, sql]) => installed.get(name) === sql)) {
+      return;
+    }
+
+    this.db.transaction(() => {
+      for (const [name, sql] of Object.entries(triggers)) {
+        this.db.exec(`DROP TRIGGER IF EXISTS ${name}`);
+        this.db.exec(sql);
+      }
+
+      this.db.exec('DELETE FROM domain_stats');
+      this.db.exec(`
+        INSERT INTO domain_stats (domain, total, high, medium)
+        SELECT domain, COUNT(*), SUM(${isHigh('patterns')}), SUM(${isMedium('patterns')})
+        FROM patterns GROUP BY domain
+      `);
+    })();
   }
 
-  async getPattern(id: string): Promise<Pattern | null> {
-    const stmt = this.db.prepare('SELECT * FROM patterns WHERE id = ?');
-    const row = stmt.get(id) as any;
+  /**
+   * Add columns introduced after the initial schema to existing databases
+   */
+  private migrateSchema(): void {
+    const columns = (this.db.prepare('PRAGMA table_info(patterns)').all() as any[])
+      .map(col => col.name);
 
-    if (!row) return null;
+    if (!columns.includes('embedding')) {
+      this.db.exec('ALTER TABLE patterns ADD COLUMN embedding BLOB');
+    }
+    if (!columns.includes('embedding_model')) {
+      this.db.exec('ALTER TABLE patterns ADD COLUMN embedding_model TEXT');
+    }
 
-    return this.rowToPattern(row);
+    const evidenceColumns = (this.db.prepare('PRAGMA table_info(pattern_evidence)').all() as any[])
+      .map(col => col.name);
+
+    if (!evidenceColumns.includes('diversity_key')) {
+      this.db.exec('ALTER TABLE pattern_evidence ADD COLUMN diversity_key TEXT');
+    }
+    this.db.exec('CREATE INDEX IF NOT EXISTS idx_evidence_diversity ON pattern_evidence(pattern_id, diversity_key)');
   }
 
-  async getAllPatterns(): Promise<Pattern[]> {
-    const stmt = this.db.prepare('SELECT * FROM patterns ORDER BY confidence DESC, observations DESC');
-    const rows = stmt.all() as any[];
+  /**
+   * In-memory patterns, reloaded when another connection has written
+   *
+   * `PRAGMA data_version` changes whenever a different connection (another
+   * server process, a script) commits to patterns.db; this connection's own
+   * writes are applied to the cache directly by `applyBatch`.
+   */
+  private cachedPatterns(): Map<string, Pattern> {
+    const version = this.stmts.dataVersion.get() as number;
+
+    if (!this.patternCache || version !== this.cacheVersion) {
+      const cache = new Map<string, Pattern>();
+      for (const row of this.stmts.getAllPatterns.iterate() as IterableIterator<any>) {
+        cache.set(row.id, this.lazyEvidence(this.rowToPattern(row)));
+      }
+
+      this.patternCache = cache;
+      this.sortedPatterns = null;
+      this.cacheVersion = version;
+    }
+
+    return this.patternCache;
+  }
+
+  /**
+   * Cached patterns in getAllPatterns order
+   */
+  private sortedCachedPatterns(): Pattern[] {
+    const cache = this.cachedPatterns();
+    if (!this.sortedPatterns) {
+      this.sortedPatterns = Array.from(cache.values()).sort(byConfidence);
+    }
+    return this.sortedPatterns;
+  }
+
+  async getPattern(id: string): Promise<Pattern | null> {
+    const pattern = this.cachedPatterns().get(id);
+
+    return pattern ? clonePattern(pattern) : null;
+  }
 
-    return rows.map(row => this.rowToPattern(row));
+  async getAllPatterns(): Promise<Pattern[]> {
+    return this.sortedCachedPatterns().map(clonePattern);
   }
 
   async getPatternsByDomain(domain: string): Promise<Pattern[]> {
-    const stmt = this.db.prepare('SELECT * FROM patterns WHERE domain = ? ORDER BY confidence DESC');
-    const rows = stmt.all(domain) as any[];
+    return this.sortedCachedPatterns()
+      .filter(pattern => pattern.domain === domain)
+      .map(clonePattern);
+  }
+
+  /**
+   * One page of patterns in getAllPatterns order, optionally filtered
+   *
+   * Keyset pagination on (confidence, observations, id): a page seeks
+   * idx_patterns_page (or idx_patterns_domain_confidence) to the previous
+   * page's confidence and reads forward from there, so deep pages skip the
+   * rows before them. `fields` limits the columns read; evidence is only
+   * loaded when listed.
+   */
+  async getPatternsPage<F extends PatternField = PatternField>(
+    options: PatternPageOptions<F> = {}
+  ): Promise<PatternPage<F>> {
+    const limit = Math.min(Math.max(1, options.limit ?? DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE);
+    const conditions: string[] = [];
+    const params: unknown[] = [];
+
+    if (options.domain !== undefined) {
+      conditions.push('domain = ?');
+      params.push(options.domain);
+    }
+    if (options.min_confidence !== undefined) {
+      conditions.push('confidence >= ?');
+      params.push(options.min_confidence);
+    }
+    if (options.cursor) {
+      const [confidence, observations, id] = decodeCursor(options.cursor);
+      // The leading `confidence <= ?` is implied by the tuple comparison but
+      // gives SQLite a range to seek; the OR alone makes it scan from the top
+      conditions.push(
+        'confidence <= ? AND (confidence < ? OR (confidence = ? AND (observations < ? OR (observations = ? AND id > ?))))'
+      );
+      params.push(confidence, confidence, confidence, observations, observations, id);
+    }
+
+    const where = conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '';
+    const rows = this.prepareCached(
+      `SELECT ${patternColumns(options.fields)} FROM patterns ${where} ORDER BY confidence DESC, observations DESC, id LIMIT ?`
+    ).all(...params, limit + 1) as any[];
 
-    return rows.map(row => this.rowToPattern(row));
+    // One row past the page tells whether another page follows
+    const hasMore = rows.length > limit;
+    const pageRows = rows.slice(0, limit);
+
+    return {
+      patterns: this.hydrateRows(pageRows, options.fields),
+      next_cursor: hasMore ? encodeCursor(pageRows[pageRows.length - 1]) : undefined,
+    };
+  }
+
+  /**
+   * Patterns with confidence in [min, max), optionally within one domain
+   *
+   * Filtered in SQL (idx_patterns_domain_confidence / idx_patterns_page), so
+   * only the returned rows are read; `fields` limits the columns read.
+   */
+  async getPatternsByConfidence<F extends PatternField = PatternField>(
+    minConfidence: number,
+    maxConfidence?: number,
+    domain?: string,
+    fields?: F[]
+  ): Promise<Array<Pick<Pattern, F>>> {
+    const conditions = ['confidence >= ?'];
+    const params: unknown[] = [minConfidence];
+
+    if (maxConfidence !== undefined) {
+      conditions.push('confidence < ?');
+      params.push(maxConfidence);
+    }
+    if (domain !== undefined) {
+      conditions.push('domain = ?');
+      params.push(domain);
+    }
+
+    const rows = this.prepareCached(
+      `SELECT ${patternColumns(fields)} FROM patterns WHERE ${conditions.join(' AND ')} ORDER BY confidence DESC, observations DESC`
+    ).all(...params) as any[];
+
+    return this.hydrateRows(rows, fields);
+  }
+
+  /**
+   * Constitution-tier patterns (confidence >= ACE_CONFIDENCE_HIGH)
+   */
+  async getConstitutionPatterns<F extends PatternField = PatternField>(fields?: F[]): Promise<Array<Pick<Pattern, F>>> {
+    // Literal threshold, so the partial idx_patterns_constitution index applies
+    const rows = this.prepareCached(`
+      SELECT ${patternColumns(fields)} FROM patterns WHERE confidence >= ${this.constitutionThreshold()}
+      ORDER BY confidence DESC, observations DESC
+    `).all() as any[];
+
+    return this.hydrateRows(rows, fields);
+  }
+
+  /**
+   * Convert pattern rows, loading evidence (when projected) in batched queries
+   */
+  private hydrateRows(rows: any[], fields?: readonly PatternField[]): Pattern[] {
+    if (fields && !fields.includes('evidence')) {
+      return rows.map(row => this.rowToPattern(row));
+    }
+
+    const evidence = new Map<string, string[]>();
+    const evidenceRows = this.selectByIds(
+      list => `SELECT pattern_id, content FROM pattern_evidence WHERE pattern_id IN (${list}) ORDER BY seq`,
+      rows.map(row => row.id)
+    );
+    for (const row of evidenceRows) {
+      const entries = evidence.get(row.pattern_id) ?? [];
+      entries.push(decodeValue(row.content));
+      evidence.set(row.pattern_id, entries);
+    }
+
+    return rows.map(row => this.rowToPattern(row, evidence.get(row.id) ?? []));
+  }
+
+  async addPattern(pattern: Pattern, embedding?: Float32Array): Promise<void> {
+    await this.applyBatch({ inserts: [{ pattern, embedding }] });
+  }
+
+  /**
+   * Insert many patterns in one transaction
+   */
+  async addPatterns(entries: Array<{ pattern: Pattern; embedding?: Float32Array }>): Promise<void> {
+    await this.applyBatch({ inserts: entries });
   }
 
   async updatePattern(id: string, updates: Partial<Pattern>): Promise<void> {
+    await this.applyBatch({ updates: [{ id, updates }] });
+  }
+
+  /**
+   * Update many patterns in one transaction
+   */
+  async updatePatterns(updates: Array<{ id: string; updates: Partial<Pattern> }>): Promise<void> {
+    await this.applyBatch({ updates });
+  }
+
+  async deletePattern(id: string): Promise<void> {
+    await this.applyBatch({ deletes: [id] });
+  }
+
+  /**
+   * Delete many patterns in one transaction
+   */
+  async deletePatterns(ids: string[]): Promise<void> {
+    await this.applyBatch({ deletes: ids });
+  }
+
+  /**
+   * Apply inserts, updates and deletes atomically through the write queue
+   *
+   * New and rewritten content is embedded before anything is written, and
+   * vector-index changes are applied only once the transaction commits.
+   */
+  async applyBatch(batch: PatternBatch): Promise<void> {
+    const inserts = batch.inserts ?? [];
+    const updates = batch.updates ?? [];
+    const evidence = batch.evidence ?? [];
+    const deletes = batch.deletes ?? [];
+
+    const touchesVectors = inserts.length > 0 || deletes.length > 0 ||
+      updates.some(({ updates: u }) => u.content || u.domain);
+
+    // Counter and evidence updates do not need the embedding model
+    if (!touchesVectors) {
+      const now = new Date().toISOString();
+      await this.writes.write(() => {
+        for (const { id, updates: u } of updates) {
+          this.writeUpdate(id, u, now);
+        }
+        this.writeEvidence(evidence, updates, now);
+      });
+      this.cacheBatch([], updates, evidence, [], now);
+      this.embeddings.markSynced(now);
+      return;
+    }
+
+    // The lease keeps a model migration from switching engines mid-batch
+    await this.withEmbeddingLease(async () => {
+      await this.embeddingsReady;
+      const engine = this.embeddings;
+
+      // Embed new and rewritten content up front (queued into shared batches)
+      const insertVectors = await Promise.all(
+        inserts.map(({ pattern, embedding }) => embedding ?? engine.getEmbedding(pattern.content))
+      );
+      const contentVectors = new Map<string, Float32Array>();
+      await Promise.all(updates.map(async ({ id, updates: u }) => {
+        if (u.content) {
+          contentVectors.set(id, await engine.getEmbedding(u.content));
+        }
+      }));
+
+      const now = new Date().toISOString();
+      const stored = inserts.map(({ pattern }) => toStoredPattern(pattern, now));
+
+      // Rows whose vector or domain partition changes (group-committed with
+      // other writes arriving in the same window)
+      const moved = await this.writes.write(() => {
+        stored.forEach((pattern, i) => this.writeInsert(pattern, insertVectors[i]));
+
+        const rows: any[] = [];
+        for (const { id, updates: u } of updates) {
+          this.writeUpdate(id, u, now, contentVectors.get(id));
+          if (u.content || u.domain) {
+            const row = this.stmts.getPatternVector.get(id);
+            if (row) rows.push(row);
+          }
+        }
+
+        this.writeEvidence(evidence, updates, now);
+
+        for (const id of deletes) {
+          this.evidence.remove(id);
+          this.stmts.deletePattern.run(id);
+        }
+
+        return rows;
+      });
+
+      this.cacheBatch(stored, updates, evidence, deletes, now);
+
+      // Committed: bring the vector index and migration staging in line
+      inserts.forEach(({ pattern }, i) => engine.loadEmbedding(pattern.id, insertVectors[i], pattern.domain));
+
+      for (const id of deletes) {
+        this.migration?.forget(id);
+        await engine.deletePattern(id);
+      }
+
+      for (const row of moved) {
+        this.migration?.forget(row.id);
+
+        const vector = contentVectors.get(row.id) ??
+          (row.embedding && row.embedding_model === engine.modelId
+            ? decodeEmbedding(row.embedding)
+            : await engine.getEmbedding(row.content));
+        engine.loadEmbedding(row.id, vector, row.domain);
+      }
+
+      engine.markSynced(now);
+    });
+  }
+
+  /**
+   * Apply a committed batch to the pattern cache (if loaded)
+   */
+  private cacheBatch(
+    inserted: Pattern[],
+    updates: Array<{ id: string; updates: Partial<Pattern> }>,
+    evidence: Array<{ id: string; evidence: string }>,
+    deletes: string[],
+    updatedAt: string
+  ): void {
+    const cache = this.patternCache;
+    if (!cache) return;
+
+    // Evidence is re-read: the per-pattern limit may have evicted entries
+    const evidenceChanged = new Set<string>(evidence.map(({ id }) => id));
+
+    for (const pattern of inserted) {
+      cache.set(pattern.id, clonePattern(pattern));
+      evidenceChanged.add(pattern.id);
+    }
+
+    for (const { id, updates: u } of updates) {
+      const existing = cache.get(id);
+      if (!existing) continue;
+
+      // Assigned onto a lazy copy so untouched evidence and metadata stay undecoded
+      const { id: _id, created_at: _createdAt, ...fields } = u;
+      cache.set(id, clonePattern(Object.assign(clonePattern(existing), fields, { updated_at: updatedAt })));
+      if (u.evidence) evidenceChanged.add(id);
+    }
+
+    // Clones already handed out hold their own decoder or copy, so the
+    // cached object can be re-pointed in place
+    for (const id of evidenceChanged) {
+      const pattern = cache.get(id);
+      if (pattern) {
+        this.lazyEvidence(pattern).updated_at = updatedAt;
+      }
+    }
+
+    for (const id of deletes) {
+      cache.delete(id);
+    }
+
+    this.sortedPatterns = null;
+  }
+
+  /**
+   * Append evidence entries, bumping updated_at of patterns not otherwise
+   * updated in the batch (as cacheBatch does)
+   */
+  private writeEvidence(
+    evidence: Array<{ id: string; evidence: string }>,
+    updates: Array<{ id: string; updates: Partial<Pattern> }>,
+    updatedAt: string
+  ): void {
+    const touched = new Set(updates.map(({ id }) => id));
+
+    for (const { id, evidence: content } of evidence) {
+      this.evidence.append(id, content, updatedAt);
+      if (!touched.has(id)) {
+        this.stmts.touchPattern.run(updatedAt, id);
+        touched.add(id);
+      }
+    }
+  }
+
+  private writeInsert(pattern: Pattern, embedding: Float32Array): void {
+    this.stmts.insertPattern.run(
+      pattern.id,
+      pattern.name,
+      pattern.domain,
+      pattern.content,
+      pattern.confidence,
+      pattern.observations,
+      pattern.harmful,
+      '[]', // Evidence rows are stored in pattern_evidence
+      pattern.created_at,
+      pattern.updated_at,
+      this.codec.encode(JSON.stringify(pattern.metadata)),
+      encodeEmbedding(embedding),
+      this.embeddings.modelId
+    );
+
+    for (const content of pattern.evidence) {
+      this.evidence.append(pattern.id, content, pattern.updated_at);
+    }
+  }
+
+  private writeUpdate(id: string, updates: Partial<Pattern>, updatedAt: string, embedding?: Float32Array): void {
     const fields: string[] = [];
     const values: any[] = [];
 
     Object.entries(updates).forEach(([key, value]) => {
-      if (key === 'evidence' || key === 'metadata') {
+      if (key === 'evidence') {
+        this.evidence.replace(id, value as string[], updatedAt);
+      } else if (key === 'metadata') {
         fields.push(`${key} = ?`);
-        values.push(JSON.stringify(value));
+        values.push(this.codec.encode(JSON.stringify(value)));
       } else if (key !== 'id' && key !== 'created_at') {
         fields.push(`${key} = ?`);
         values.push(value);
       }
     });
 
+    // Rewritten content is stored with its new vector
+    if (embedding) {
+      fields.push('embedding = ?', 'embedding_model = ?');
+      values.push(encodeEmbedding(embedding), this.embeddings.modelId);
+    }
+
     fields.push('updated_at = ?');
-    values.push(new Date().toISOString());
+    values.push(updatedAt);
     values.push(id);
 
-    const stmt = this.db.prepare(`UPDATE patterns SET ${fields.join(', ')} WHERE id = ?`);
-    stmt.run(...values);
+    // Keyed by column set, so repeated update shapes reuse one statement
+    this.prepareCached(`UPDATE patterns SET ${fields.join(', ')} WHERE id = ?`).run(...values);
+  }
 
-    // Update vector store if content changed
-    if (updates.content) {
-      const pattern = await this.getPattern(id);
-      if (pattern) {
-        await this.embeddings.updatePattern(pattern);
-      }
-    }
+  /**
+   * Embed many texts in batched forward passes
+   */
+  async embedBatch(texts: string[]): Promise<Float32Array[]> {
+    await this.embeddingsReady;
+    return this.embeddings.embedBatch(texts);
   }
 
-  async deletePattern(id: string): Promise<void> {
-    const stmt = this.db.prepare('DELETE FROM patterns WHERE id = ?');
-    stmt.run(id);
+  /**
+   * Embedding queue metrics
+   */
+  getEmbeddingQueueStats(): BatcherStats {
+    return this.embeddings.getQueueStats();
+  }
+
+  /**
+   * Query embedding cache metrics
+   */
+  getQueryCacheStats(): QueryCacheStats {
+    return this.embeddings.getQueryCacheStats();
+  }
+
+  /**
+   * Write queue metrics (group commit)
+   */
+  getWriteQueueStats(): WriteQueueStats {
+    return this.writes.getStats();
+  }
 
-    await this.embeddings.deletePattern(id);
+  /**
+   * Vector count per domain partition
+   */
+  getVectorPartitions(): Record<string, number> {
+    return this.embeddings.getPartitionSizes();
   }
 
+  /**
+   * Find similar patterns, optionally within a single domain's partition
+   */
   async findSimilarPatterns(
     content: string,
-    threshold: number
+    threshold: number,
+    domain?: string
+  ): Promise<Array<{ pattern: Pattern; similarity: number }>> {
+    await this.embeddingsReady;
+    const similar = await this.embeddings.findSimilar(content, threshold, domain);
+    return this.hydrateSimilar(similar);
+  }
+
+  /**
+   * Find similar patterns for an already computed embedding
+   */
+  async findSimilarPatternsByEmbedding(
+    embedding: Float32Array,
+    threshold: number,
+    domain?: string
+  ): Promise<Array<{ pattern: Pattern; similarity: number }>> {
+    await this.embeddingsReady;
+    const similar = this.embeddings.findSimilarByEmbedding(embedding, threshold, domain);
+    return this.hydrateSimilar(similar);
+  }
+
+  /**
+   * Find the k most similar patterns (fixed-size heap, no full sort)
+   */
+  async findTopKPatterns(
+    content: string,
+    k: number,
+    minSimilarity: number,
+    domain?: string
+  ): Promise<Array<{ pattern: Pattern; similarity: number }>> {
+    await this.embeddingsReady;
+    const similar = await this.embeddings.findTopK(content, k, minSimilarity, domain);
+    return this.hydrateSimilar(similar);
+  }
+
+  /**
+   * Find the k most similar patterns for an already computed embedding
+   */
+  async findTopKPatternsByEmbedding(
+    embedding: Float32Array,
+    k: number,
+    minSimilarity: number,
+    domain?: string
   ): Promise<Array<{ pattern: Pattern; similarity: number }>> {
-    const similar = await this.embeddings.findSimilar(content, threshold);
+    await this.embeddingsReady;
+    const similar = this.embeddings.findTopKByEmbedding(embedding, k, minSimilarity, domain);
+    return this.hydrateSimilar(similar);
+  }
 
+  /**
+   * Look up the patterns for similarity hits in the pattern cache, keeping hit order
+   */
+  private hydrateSimilar(
+    similar: Array<{ id: string; similarity: number }>
+  ): Array<{ pattern: Pattern; similarity: number }> {
+    if (similar.length === 0) return [];
+
+    const patterns = this.cachedPatterns();
     const results: Array<{ pattern: Pattern; similarity: number }> = [];
 
     for (const { id, similarity } of similar) {
-      const pattern = await this.getPattern(id);
+      const pattern = patterns.get(id);
       if (pattern) {
-        results.push({ pattern, similarity });
+        results.push({ pattern: clonePattern(pattern), similarity });
       }
     }
 
@@ -194,24 +1412,18 @@ export class ACEStorage implements StorageBackend {
     low_confidence: number;
     domains: string[];
   }> {
-    const totalStmt = this.db.prepare('SELECT COUNT(*) as count FROM patterns');
-    const total = (totalStmt.get() as any).count;
-
-    const highStmt = this.db.prepare(
-      'SELECT COUNT(*) as count FROM patterns WHERE confidence >= ?'
-    );
-    const high = (highStmt.get(this.config.ace.confidence_threshold_high) as any).count;
+    // One row per domain (maintained by triggers), not a scan of patterns
+    const domainRows = this.stmts.domainStats.all() as any[];
 
-    const mediumStmt = this.db.prepare(
-      'SELECT COUNT(*) as count FROM patterns WHERE confidence >= ? AND confidence < ?'
-    );
-    const medium = (mediumStmt.get(
-      this.config.ace.confidence_threshold_medium,
-      this.config.ace.confidence_threshold_high
-    ) as any).count;
+    let total = 0;
+    let high = 0;
+    let medium = 0;
+    for (const row of domainRows) {
+      total += row.total;
+      high += row.high;
+      medium += row.medium;
+    }
 
-    const domainsStmt = this.db.prepare('SELECT DISTINCT domain FROM patterns ORDER BY domain');
-    const domainRows = domainsStmt.all() as any[];
     const domains = domainRows.map(row => row.domain);
 
     return {
@@ -223,27 +1435,73 @@ export class ACEStorage implements StorageBackend {
     };
   }
 
+  /**
+   * One page of domain names in sorted order, starting after `after`
+   */
+  async listDomains(after: string = '', limit: number = 100): Promise<string[]> {
+    return this.stmts.domainPage.all(after, limit) as string[];
+  }
+
+  /**
+   * Delete every pattern and all learning history
+   *
+   * Does not wait for the embedding model, so it works while the model is
+   * loading or after it failed to load; a startup still loading vectors
+   * finds the tables empty.
+   */
   async clear(): Promise<void> {
-    this.db.exec('DELETE FROM patterns');
-    this.db.exec('DELETE FROM insights');
-    this.db.exec('DELETE FROM epochs');
+    await this.writes.exclusive(async () => {
+      await this.writes.write(() => {
+        this.db.exec('DELETE FROM patterns');
+        this.db.exec('DELETE FROM pattern_evidence');
+        this.db.exec('DELETE FROM insights');
+        this.db.exec('DELETE FROM epochs');
+        this.db.exec('DELETE FROM embedding_migration');
+      });
+      this.patternCache = null;
 
-    await this.embeddings.clear();
+      // In-memory vectors only; no model needed
+      await this.embeddings?.clear();
+    });
   }
 
-  private rowToPattern(row: any): Pattern {
-    return {
-      id: row.id,
-      name: row.name,
-      domain: row.domain,
-      content: row.content,
-      confidence: row.confidence,
-      observations: row.observations,
-      harmful: row.harmful,
-      evidence: JSON.parse(row.evidence),
-      created_at: row.created_at,
-      updated_at: row.updated_at,
-      metadata: row.metadata ? JSON.parse(row.metadata) : {},
-    };
+  /**
+   * Read a cached pattern's evidence from pattern_evidence on first access
+   *
+   * One query per cached pattern, shared by every clone handed out until
+   * the evidence changes.
+   */
+  private lazyEvidence(pattern: Pattern): Pattern {
+    const id = pattern.id;
+    defineLazy(pattern, 'evidence', decodeOnce(() => this.evidence.list(id), evidence => [...evidence]));
+    return pattern;
+  }
+
+  /**
+   * Build a pattern from a (possibly projected) row
+   *
+   * Only the columns present are set; metadata is decompressed and
+   * JSON-decoded on first access.
+   */
+  private rowToPattern(row: any, evidence?: string[]): Pattern {
+    const pattern: any = {};
+
+    for (const field of PATTERN_FIELDS) {
+      if (field === 'evidence') {
+        if (evidence) pattern.evidence = evidence;
+      } else if (field === 'metadata') {
+        if ('metadata' in row) {
+          const raw: string | Buffer | null = row.metadata;
+          defineLazy(pattern as Pattern, 'metadata', decodeOnce(
+            () => (raw ? JSON.parse(decodeValue(raw)) : {}),
+            metadata => ({ ...metadata })
+          ));
+        }
+      } else if (field in row) {
+        pattern[field] = row[field];
+      }
+    }
+
+    return pattern as Pattern;
   }
 }
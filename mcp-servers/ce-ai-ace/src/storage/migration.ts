@@ -0,0 +1,224 @@
+/**
+ * ACE Embedding Migration
+ *
+ * Re-embeds every pattern with a new model in the background. New vectors are
+ * staged in `embedding_migration` (so the job resumes after a restart) while
+ * similarity queries keep using the old model's vectors. Once every row is
+ * staged, the vectors and the live engine are switched over in one step.
+ */
+
+import Database from 'better-sqlite3';
+import { ACEConfig } from '../config.js';
+import { EmbeddingsEngine } from '../embeddings/index.js';
+import { MigrationProgress } from '../types.js';
+
+// Poll interval while waiting for interactive embedding work to finish
+const IDLE_POLL_MS = 50;
+
+export interface MigrationHooks {
+  // Interactive work the job must not starve (serving queue, curate leases)
+  isBusy(): boolean;
+  // Called synchronously, right after vectors are switched in the database
+  onSwitch(target: EmbeddingsEngine): void;
+  // Run a write through storage's write queue
+  write<T>(fn: () => T): Promise<T>;
+  encode(embedding: Float32Array): Buffer;
+  decode(blob: Buffer): Float32Array;
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+export class EmbeddingMigration {
+  private db: Database.Database;
+  private target: EmbeddingsEngine;
+  private config: ACEConfig;
+  private hooks: MigrationHooks;
+  private progress: MigrationProgress;
+  private forgetStmt: Database.Statement;
+  private countPatternsStmt: Database.Statement;
+  private countStagedStmt: Database.Statement;
+  private stopped = false;
+
+  constructor(
+    db: Database.Database,
+    target: EmbeddingsEngine,
+    fromModel: string,
+    config: ACEConfig,
+    hooks: MigrationHooks
+  ) {
+    this.db = db;
+    this.target = target;
+    this.config = config;
+    this.hooks = hooks;
+    this.forgetStmt = db.prepare('DELETE FROM embedding_migration WHERE pattern_id = ?');
+    this.countPatternsStmt = db.prepare('SELECT COUNT(*) as count FROM patterns');
+    this.countStagedStmt = db.prepare('SELECT COUNT(*) as count FROM embedding_migration');
+    this.progress = {
+      state: 'running',
+      from_model: fromModel,
+      to_model: target.modelId,
+      total: 0,
+      done: 0,
+      started_at: new Date().toISOString(),
+    };
+  }
+
+  getProgress(): MigrationProgress {
+    return { ...this.progress };
+  }
+
+  /**
+   * Drop any staged vector for a pattern that was deleted or rewritten
+   */
+  forget(id: string): void {
+    this.hooks.write(() => this.forgetStmt.run(id)).catch(error =>
+      console.error(`⚠️  Failed to drop staged vector for ${id}:`, error)
+    );
+    void this.target.deletePattern(id);
+  }
+
+  /**
+   * Stop a running job and its engine; staged vectors are kept for resume
+   */
+  async stop(): Promise<void> {
+    if (this.progress.state !== 'running') return;
+    this.stopped = true;
+    await this.target.dispose();
+  }
+
+  async run(): Promise<void> {
+    try {
+      await this.target.initialize();
+      await this.resume();
+      await this.migrate();
+    } catch (error) {
+      if (this.stopped) return;
+      this.progress.state = 'failed';
+      this.progress.error = (error as Error).message;
+      console.error('❌ Embedding migration failed:', error);
+    }
+  }
+
+  /**
+   * Load vectors staged by an earlier, interrupted run
+   */
+  private async resume(): Promise<void> {
+    const model = this.target.modelId;
+
+    // Vectors staged for a model that is no longer the target are useless
+    const discardStmt = this.db.prepare('DELETE FROM embedding_migration WHERE model != ?');
+    await this.hooks.write(() => discardStmt.run(model));
+
+    const stmt = this.db.prepare(`
+      SELECT m.pattern_id, m.embedding, p.domain FROM embedding_migration m
+      JOIN patterns p ON p.id = m.pattern_id
+      WHERE m.model = ?
+    `);
+    for (const row of stmt.iterate(model) as IterableIterator<any>) {
+      this.target.loadEmbedding(row.pattern_id, this.hooks.decode(row.embedding), row.domain);
+    }
+
+    if (this.target.getCacheSize() > 0) {
+      console.error(`🔄 Resuming embedding migration (${this.target.getCacheSize()} vectors staged)`);
+    }
+  }
+
+  private async migrate(): Promise<void> {
+    const model = this.target.modelId;
+    const { migration_batch_size: batchSize, migration_delay_ms: delayMs } = this.config.embeddings;
+
+    const pendingStmt = this.db.prepare(`
+      SELECT p.id, p.domain, p.content FROM patterns p
+      LEFT JOIN embedding_migration m ON m.pattern_id = p.id
+      WHERE m.pattern_id IS NULL
+      LIMIT ?
+    `);
+
+    // Stage only if the pattern still exists with the content we embedded
+    const stageStmt = this.db.prepare(`
+      INSERT OR REPLACE INTO embedding_migration (pattern_id, model, embedding)
+      SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM patterns WHERE id = ? AND content = ?)
+    `);
+
+    console.error(`🔄 Migrating embeddings: ${this.progress.from_model} → ${model}`);
+
+    while (true) {
+      // Yield to interactive reflect/playbook calls
+      while (this.hooks.isBusy()) {
+        await sleep(IDLE_POLL_MS);
+      }
+      if (this.stopped) return;
+
+      this.updateCounts();
+      const rows = pendingStmt.all(Math.max(1, batchSize)) as any[];
+
+      if (rows.length === 0) {
+        if (await this.switchOver(pendingStmt)) return;
+        continue;
+      }
+
+      const embeddings = await this.target.embedBatch(rows.map(row => row.content));
+
+      const staged = await this.hooks.write(() =>
+        rows.filter((row, i) =>
+          stageStmt.run(row.id, model, this.hooks.encode(embeddings[i]), row.id, row.content).changes > 0
+        )
+      );
+
+      rows.forEach((row, i) => {
+        if (staged.includes(row)) {
+          this.target.loadEmbedding(row.id, embeddings[i], row.domain);
+        }
+      });
+
+      this.updateCounts();
+      await sleep(delayMs);
+    }
+  }
+
+  /**
+   * Move staged vectors into patterns and hand the new engine to storage
+   *
+   * Runs as one queued write that re-checks, when it runs, that no pattern
+   * is left to stage and no embedding work is in flight, and switches the
+   * engine in the same synchronous step. Returns false (nothing switched)
+   * if either check fails.
+   */
+  private async switchOver(pendingStmt: Database.Statement): Promise<boolean> {
+    const model = this.target.modelId;
+
+    const switchStmt = this.db.prepare(`
+      UPDATE patterns
+      SET embedding = (SELECT embedding FROM embedding_migration WHERE pattern_id = patterns.id),
+          embedding_model = ?
+      WHERE id IN (SELECT pattern_id FROM embedding_migration)
+    `);
+    const clearStmt = this.db.prepare('DELETE FROM embedding_migration');
+    const idsStmt = this.db.prepare('SELECT id FROM patterns').pluck();
+
+    const switched = await this.hooks.write(() => {
+      if (this.hooks.isBusy() || pendingStmt.all(1).length > 0) return false;
+
+      switchStmt.run(model);
+      clearStmt.run();
+
+      this.target.retainEmbeddings(new Set(idsStmt.all() as string[]));
+      this.hooks.onSwitch(this.target);
+      return true;
+    });
+
+    if (!switched) return false;
+
+    this.progress.state = 'complete';
+    this.progress.completed_at = new Date().toISOString();
+    console.error(`✅ Embedding migration complete (${this.progress.done} patterns on ${model})`);
+    return true;
+  }
+
+  private updateCounts(): void {
+    this.progress.total = (this.countPatternsStmt.get() as any).count;
+    this.progress.done = (this.countStagedStmt.get() as any).count;
+  }
+}
@@ -0,0 +1,239 @@
+/**
+ * ACE Write Queue
+ *
+ * Every ACEStorage mutation goes through one queue, so writes never
+ * interleave. Writes run inside one open transaction that is committed
+ * `windowMs` after its first write (group commit): one COMMIT, and one
+ * fsync, covers every write in the window. Each write runs in its own
+ * savepoint so a failing write does not roll back the rest of its group.
+ *
+ * Exclusive sections (a whole curate run: read, merge, write; clear) hold the
+ * queue until they finish. Their writes run immediately and join the open
+ * transaction, so the section reads them back on this connection; the
+ * section resolves once the transaction holding its writes commits, which
+ * lets consecutive curate runs share a commit. Writes made outside a section
+ * wait until no section is running and resolve once committed.
+ */
+
+import Database from 'better-sqlite3';
+import { AsyncLocalStorage } from 'async_hooks';
+
+interface PendingWrite {
+  fn: () => unknown;
+  resolve: (value: any) => void;
+  reject: (error: unknown) => void;
+}
+
+// Settles once the open transaction commits or rolls back
+interface CommitWaiter {
+  resolve: () => void;
+  reject: (error: unknown) => void;
+}
+
+interface Section {
+  writes: number; // Writes made by the section so far
+}
+
+export interface WriteQueueStats {
+  pending: number;       // Writes waiting for the queue
+  transactions: number;  // Transactions committed
+  writes: number;        // Writes committed
+  max_group: number;     // Most writes committed in one transaction
+  exclusive: number;     // Exclusive sections run
+}
+
+export class WriteQueue {
+  private db: Database.Database;
+  private windowMs: number;
+  private onRollback: () => void;
+  private tail: Promise<void> = Promise.resolve();
+  private pending: PendingWrite[] = [];
+  private open = false; // BEGIN issued, not yet committed
+  private uncommitted = 0;
+  private waiters: CommitWaiter[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private flushQueued = false;
+  private section = new AsyncLocalStorage<Section>();
+  private stats = { transactions: 0, writes: 0, max_group: 0, exclusive: 0 };
+
+  /**
+   * @param onRollback Called when a group fails to commit, so state derived
+   *                   from its writes (caches) can be dropped
+   */
+  constructor(db: Database.Database, windowMs: number, onRollback: () => void = () => {}) {
+    this.db = db;
+    this.windowMs = Math.max(0, windowMs);
+    this.onRollback = onRollback;
+  }
+
+  /**
+   * Queue a synchronous write; resolves with its result once committed
+   *
+   * Inside an exclusive section the write runs now and resolves with its
+   * result right away; the section itself waits for the commit.
+   */
+  write<T>(fn: () => T): Promise<T> {
+    const section = this.section.getStore();
+    if (section) {
+      // The queue is already held: join the open transaction now
+      try {
+        const result = this.run(fn);
+        section.writes++;
+        this.scheduleCommit();
+        return Promise.resolve(result);
+      } catch (error) {
+        return Promise.reject(error);
+      }
+    }
+
+    return new Promise<T>((resolve, reject) => {
+      this.pending.push({ fn, resolve, reject });
+      this.scheduleCommit();
+    });
+  }
+
+  /**
+   * Run `fn` with no other write made until it settles
+   *
+   * Settles once `fn` has and the writes it made are committed.
+   */
+  exclusive<T>(fn: () => Promise<T>): Promise<T> {
+    if (this.section.getStore()) {
+      return fn();
+    }
+
+    // Writes queued before the section run first
+    if (this.pending.length > 0) {
+      this.enqueueFlush();
+    }
+
+    const section: Section = { writes: 0 };
+    const run = this.tail.then(() => {
+      this.stats.exclusive++;
+      return this.section.run(section, fn);
+    });
+    this.tail = run.then(() => undefined, () => undefined);
+
+    return run.then(
+      result => this.committed(section).then(() => result),
+      error => this.committed(section).then(() => Promise.reject(error), () => Promise.reject(error))
+    );
+  }
+
+  /**
+   * Run every queued write and commit the open transaction
+   */
+  async drain(): Promise<void> {
+    await this.exclusive(async () => {});
+    this.commit();
+  }
+
+  getStats(): WriteQueueStats {
+    return { pending: this.pending.length, ...this.stats };
+  }
+
+  /**
+   * Run one write in a savepoint of the open transaction (begun if needed)
+   */
+  private run<T>(fn: () => T): T {
+    if (!this.open) {
+      this.db.exec('BEGIN');
+      this.open = true;
+    }
+
+    // Nested transaction = savepoint: only this write rolls back on error
+    const result = this.db.transaction(fn)();
+    this.uncommitted++;
+    return result;
+  }
+
+  /**
+   * Resolves once a finished section's writes are committed
+   */
+  private committed(section: Section): Promise<void> {
+    if (section.writes === 0 || !this.open) {
+      return Promise.resolve();
+    }
+    return new Promise((resolve, reject) => this.waiters.push({ resolve, reject }));
+  }
+
+  private scheduleCommit(): void {
+    if (this.timer) return;
+
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      // Section writes commit now, even mid-section; queued writes run
+      // (and commit) once no section holds the queue
+      this.commit();
+      if (this.pending.length > 0) {
+        this.enqueueFlush();
+      }
+    }, this.windowMs);
+  }
+
+  private enqueueFlush(): void {
+    if (this.flushQueued) return;
+
+    // Writes arriving until the flush actually runs join its group
+    this.flushQueued = true;
+    this.tail = this.tail.then(() => {
+      this.flushQueued = false;
+      const group = this.pending;
+      this.pending = [];
+      this.flush(group);
+    });
+  }
+
+  private flush(group: PendingWrite[]): void {
+    for (const { fn, resolve, reject } of group) {
+      try {
+        const result = this.run(fn);
+        this.waiters.push({ resolve: () => resolve(result), reject });
+      } catch (error) {
+        reject(error);
+      }
+    }
+
+    this.commit();
+  }
+
+  /**
+   * Commit the open transaction and settle everything waiting on it
+   */
+  private commit(): void {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (!this.open) return;
+
+    const waiters = this.waiters;
+    const writes = this.uncommitted;
+    this.waiters = [];
+    this.uncommitted = 0;
+    this.open = false;
+
+    try {
+      this.db.exec('COMMIT');
+    } catch (error) {
+      // Nothing in the group was written
+      if (this.db.inTransaction) {
+        this.db.exec('ROLLBACK');
+      }
+      this.onRollback();
+      waiters.forEach(({ reject }) => reject(error));
+      return;
+    }
+
+    if (writes > 0) {
+      this.recordCommit(writes);
+    }
+    waiters.forEach(({ resolve }) => resolve());
+  }
+
+  private recordCommit(writes: number): void {
+    this.stats.transactions++;
+    this.stats.writes += writes;
+    this.stats.max_group = Math.max(this.stats.max_group, writes);
+  }
+}
@@ -66,7 +66,7 @@ export function registerTools(
         },
         {
           name: 'ace_get_patterns',
-          description: 'Get patterns from ACE database with optional filtering',
+          description: 'Get patterns from ACE database with optional filtering, one page at a time (pass next_cursor back as cursor for the next page)',
           inputSchema: {
             type: 'object',
             properties: {
@@ -78,6 +78,14 @@ export function registerTools(
                 type: 'number',
                 description: 'Minimum confidence threshold (0-1, optional)',
               },
+              limit: {
+                type: 'number',
+                description: 'Patterns per page (default 100, max 500)',
+              },
+              cursor: {
+                type: 'string',
+                description: 'next_cursor from the previous page (optional)',
+              },
             },
           },
         },
@@ -91,6 +99,10 @@ export function registerTools(
                 type: 'string',
                 description: 'Task description for semantic filtering (optional)',
               },
+              domain: {
+                type: 'string',
+                description: 'Restrict to one domain (optional)',
+              },
             },
           },
         },
@@ -260,30 +272,33 @@ async function handleTrainOffline(
  * Handle ace_get_patterns tool call
  */
 async function handleGetPatterns(args: any, storage: ACEStorage): Promise<any> {
-  const { domain, min_confidence } = args;
-
-  let patterns = domain
-    ? await storage.getPatternsByDomain(domain)
-    : await storage.getAllPatterns();
-
-  if (min_confidence !== undefined) {
-    patterns = patterns.filter(p => p.confidence >= min_confidence);
-  }
+  const { domain, min_confidence, limit, cursor } = args;
+
+  const page = await storage.getPatternsPage({
+    domain,
+    min_confidence,
+    limit,
+    cursor,
+    fields: ['id', 'name', 'domain', 'content', 'confidence', 'observations', 'harmful'],
+  });
 
   return {
     content: [
       {
         type: 'text',
         text: JSON.stringify(
-          patterns.map(p => ({
-            id: p.id,
-            name: p.name,
-            domain: p.domain,
-            content: p.content,
-            confidence: p.confidence,
-            observations: p.observations,
-            harmful: p.harmful,
-          })),
+          {
+            patterns: page.patterns.map(p => ({
+              id: p.id,
+              name: p.name,
+              domain: p.domain,
+              content: p.content,
+              confidence: p.confidence,
+              observations: p.observations,
+              harmful: p.harmful,
+            })),
+            next_cursor: page.next_cursor,
+          },
           null,
           2
         ),
@@ -296,9 +311,9 @@ async function handleGetPatterns(args: any, storage: ACEStorage): Promise<any> {
  * Handle ace_get_playbook tool call
  */
 async function handleGetPlaybook(args: any, curator: Curator): Promise<any> {
-  const { task_hint } = args;
+  const { task_hint, domain } = args;
 
-  const playbook = await curator.formatPlaybook(task_hint);
+  const playbook = await curator.formatPlaybook(task_hint, domain);
 
   return {
     content: [
@@ -315,6 +330,25 @@ async function handleGetPlaybook(args: any, curator: Curator): Promise<any> {
  */
 async function handleStatus(storage: ACEStorage): Promise<any> {
   const stats = await storage.getStats();
+  const readiness = storage.getReadiness();
+  const migration = storage.getMigrationProgress();
+  const queue = storage.getEmbeddingQueueStats();
+  const cache = storage.getQueryCacheStats();
+  const writes = storage.getWriteQueueStats();
+  const partitions = Object.entries(storage.getVectorPartitions())
+    .map(([domain, count]) => `${domain}: ${count}`)
+    .join(', ');
+
+  let migrationText = '';
+  if (migration) {
+    migrationText = `
+**Embedding Migration**: ${migration.state} (${migration.from_model} → ${migration.to_model})
+- Progress: ${migration.done}/${migration.total} patterns
+`;
+    if (migration.error) {
+      migrationText += `- Error: ${migration.error}\n`;
+    }
+  }
 
   const output = `# ACE Pattern Database Status
 
@@ -325,6 +359,24 @@ async function handleStatus(storage: ACEStorage): Promise<any> {
 
 **Domains**: ${stats.domains.join(', ') || 'none'}
 
+**Embeddings**: ${readiness.state} (${readiness.model})${readiness.error ? ` - ${readiness.error}` : ''}
+- Vector Partitions: ${partitions || 'none'}
+${migrationText}
+**Embedding Queue**:
+- Queue Depth: ${queue.queue_depth} (max ${queue.max_queue_depth})
+- Batches: ${queue.batches}, Texts: ${queue.items}
+- Batch Size: avg ${queue.avg_batch_size.toFixed(1)}, max ${queue.max_batch_size}
+
+**Query Embedding Cache**:
+- Entries: ${cache.entries} (${(cache.bytes / 1024 / 1024).toFixed(1)} MB)
+- Hit Rate: ${(cache.hit_rate * 100).toFixed(1)}% (${cache.hits} hits, ${cache.misses} misses)
+- Evictions: ${cache.evictions}
+
+**Write Queue**:
+- Pending Writes: ${writes.pending}
+- Transactions: ${writes.transactions} for ${writes.writes} writes (max ${writes.max_group} per commit)
+- Exclusive Sections: ${writes.exclusive}
+
 **Database**: \`.ace-memory/patterns.db\`
 `;
 
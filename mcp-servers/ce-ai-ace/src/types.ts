@@ -67,6 +67,73 @@ export interface TrainingStats {
   files_processed: number;
 }
 
+/**
+ * EmbeddingsReadiness - Background embedding model loading state
+ */
+export interface EmbeddingsReadiness {
+  state: 'loading' | 'ready' | 'failed';
+  model: string;
+  started_at: string;    // ISO timestamp
+  ready_at?: string;     // ISO timestamp
+  error?: string;
+}
+
+/**
+ * MigrationProgress - Background re-embedding after an embedding model change
+ */
+export interface MigrationProgress {
+  state: 'running' | 'complete' | 'failed';
+  from_model: string;
+  to_model: string;
+  total: number;         // Patterns to migrate
+  done: number;          // Patterns with a staged vector for the new model
+  started_at: string;    // ISO timestamp
+  completed_at?: string; // ISO timestamp
+  error?: string;
+}
+
+/**
+ * CompactionReport - Result of rewriting stored values with compression
+ */
+export interface CompactionReport {
+  evidence_rows: number;
+  metadata_rows: number;
+  rows_rewritten: number;
+  bytes_before: number;      // Stored evidence + metadata bytes
+  bytes_after: number;
+  bytes_saved: number;
+  file_bytes_before: number; // patterns.db + WAL on disk
+  file_bytes_after: number;
+}
+
+/**
+ * PatternPage - One keyset page of patterns (confidence, observations, id order)
+ */
+export type PatternField = keyof Pattern;
+
+export interface PatternPageOptions<F extends PatternField = PatternField> {
+  domain?: string;
+  min_confidence?: number;
+  limit?: number;
+  cursor?: string;               // next_cursor of the previous page
+  fields?: F[];                  // Projection (default: all; evidence only if listed)
+}
+
+export interface PatternPage<F extends PatternField = PatternField> {
+  patterns: Array<Pick<Pattern, F>>;
+  next_cursor?: string;          // Absent on the last page
+}
+
+/**
+ * Pattern writes applied in a single transaction
+ */
+export interface PatternBatch {
+  inserts?: Array<{ pattern: Pattern; embedding?: Float32Array }>;
+  updates?: Array<{ id: string; updates: Partial<Pattern> }>;
+  evidence?: Array<{ id: string; evidence: string }>; // Appended, deduplicated and capped per pattern
+  deletes?: string[];
+}
+
 /**
  * Storage Backend interface
  */
@@ -74,15 +141,29 @@ export interface StorageBackend {
   initialize(): Promise<void>;
 
   // Pattern operations
-  addPattern(pattern: Pattern): Promise<void>;
+  addPattern(pattern: Pattern, embedding?: Float32Array): Promise<void>;
   getPattern(id: string): Promise<Pattern | null>;
   getAllPatterns(): Promise<Pattern[]>;
   getPatternsByDomain(domain: string): Promise<Pattern[]>;
+  getPatternsPage<F extends PatternField>(options?: PatternPageOptions<F>): Promise<PatternPage<F>>;
+  getPatternsByConfidence<F extends PatternField>(
+    minConfidence: number,
+    maxConfidence?: number,
+    domain?: string,
+    fields?: F[]
+  ): Promise<Array<Pick<Pattern, F>>>;
   updatePattern(id: string, updates: Partial<Pattern>): Promise<void>;
   deletePattern(id: string): Promise<void>;
 
+  // Bulk operations (one transaction each)
+  addPatterns(entries: Array<{ pattern: Pattern; embedding?: Float32Array }>): Promise<void>;
+  updatePatterns(updates: Array<{ id: string; updates: Partial<Pattern> }>): Promise<void>;
+  deletePatterns(ids: string[]): Promise<void>;
+  applyBatch(batch: PatternBatch): Promise<void>;
+
   // Search operations
-  findSimilarPatterns(content: string, threshold: number): Promise<Array<{ pattern: Pattern; similarity: number }>>;
+  findSimilarPatterns(content: string, threshold: number, domain?: string): Promise<Array<{ pattern: Pattern; similarity: number }>>;
+  findTopKPatterns(content: string, k: number, minSimilarity: number, domain?: string): Promise<Array<{ pattern: Pattern; similarity: number }>>;
 
   // Stats
   getStats(): Promise<{
@@ -238,6 +238,76 @@ addTest('Package files whitelist is correct', async () => {
   log(`   Files whitelist: ${pkg.files.join(', ')}`, 'info');
 });
 
+// Test 7: Deep pattern pages seek the index
+addTest('Pattern pages seek the index', async () => {
+  const { mkdtempSync, rmSync } = require('fs');
+  const { tmpdir } = require('os');
+  const { join } = require('path');
+  const { pathToFileURL } = require('url');
+
+  const dir = mkdtempSync(join(tmpdir(), 'ace-plan-'));
+  process.env.ACE_STORAGE_PATH = join(dir, 'patterns.db');
+  let storage;
+
+  try {
+    const { getConfig } = await import(pathToFileURL(join(__dirname, 'dist/config.js')).href);
+    const { ACEStorage } = await import(pathToFileURL(join(__dirname, 'dist/storage/index.js')).href);
+
+    const opened = new ACEStorage(getConfig());
+    await opened.initialize();
+    storage = opened;
+
+    // Record the SQL and parameters getPatternsPage runs on the connection
+    const db = storage.db;
+    let query;
+    const prepare = db.prepare;
+    db.prepare = function (sql) {
+      const stmt = prepare.call(this, sql);
+      const all = stmt.all;
+      stmt.all = (...params) => {
+        query = { sql, params };
+        return all.apply(stmt, params);
+      };
+      return stmt;
+    };
+
+    // Cursor format: base64url JSON of the last row's sort key
+    const cursor = Buffer.from(JSON.stringify([0.5, 3, 'pat-x'])).toString('base64url');
+    const pages = [
+      { cursor },
+      { cursor, domain: 'api' },
+      { cursor, min_confidence: 0.3 },
+      { cursor, domain: 'api', min_confidence: 0.3 },
+    ];
+
+    // Read `query` before awaiting: background startup work also prepares
+    const plans = [];
+    for (const options of pages) {
+      query = undefined;
+      const page = storage.getPatternsPage(options);
+      plans.push({ options, query });
+      await page;
+    }
+    delete db.prepare;
+
+    for (const { options, query } of plans) {
+      if (!query) {
+        throw new Error(`Page ${JSON.stringify(options)} ran no query`);
+      }
+      const plan = db.prepare(`EXPLAIN QUERY PLAN ${query.sql}`).all(...query.params).map(row => row.detail);
+      if (!plan.every(step => step.startsWith('SEARCH'))) {
+        throw new Error(`Page ${JSON.stringify(options)} scans: ${plan.join('; ')}`);
+      }
+    }
+
+    log(`   ${pages.length} cursor queries use an index range`, 'info');
+  } finally {
+    await storage?.close();
+    delete process.env.ACE_STORAGE_PATH;
+    rmSync(dir, { recursive: true, force: true });
+  }
+});
+
 // Run all tests
 runTests().catch((error) => {
   log(`\n❌ Test runner failed: ${error.message}`, 'error');